@@ -0,0 +1,59 @@
+from video_analysis_toolbox.benchmarks import make_video
+import cv2
+import numpy as np
+import pytest
+
+
+@pytest.fixture(scope='session')
+def video_path(tmp_path_factory):
+    path = make_video(tmp_path_factory.mktemp('videos').joinpath('video.avi'), n_frames=120, shape=(64, 48))
+    if path is None:
+        pytest.skip('XVID codec not available')
+    return path
+
+
+@pytest.fixture(scope='session')
+def reference(video_path):
+    """Every frame of the video, decoded sequentially."""
+    cap = cv2.VideoCapture(str(video_path))
+    frames = []
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame[..., 0])
+    cap.release()
+    return np.array(frames)
+
+
+class CountingCapture:
+    """Wraps a capture object and counts the calls to grab, read and set."""
+
+    def __init__(self, cap):
+        self.cap = cap
+        self.grabs = self.reads = self.seeks = 0
+
+    def grab(self):
+        self.grabs += 1
+        return self.cap.grab()
+
+    def read(self, *args):
+        self.reads += 1
+        return self.cap.read(*args)
+
+    def set(self, prop, value):
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            self.seeks += 1
+        return self.cap.set(prop, value)
+
+    def __getattr__(self, name):
+        return getattr(self.cap, name)
+
+
+@pytest.fixture
+def counting():
+    """Returns a function that replaces the capture object of a _VideoFile with a CountingCapture."""
+    def wrap(video):
+        video._cap = CountingCapture(video.cap)
+        return video._cap
+    return wrap
@@ -0,0 +1,65 @@
+from video_analysis_toolbox.image_processing.background import BackgroundModel, BackgroundContourDetector
+from video_analysis_toolbox.tracking.roi import ROITracker
+import numpy as np
+import pytest
+
+
+def make_frames(n=10, shape=(60, 80)):
+    """Gradient background with a bright square moving to the right."""
+    background = np.tile(np.linspace(0, 100, shape[1]).astype('uint8'), (shape[0], 1))
+    frames = np.repeat(background[None], n, axis=0)
+    for i, frame in enumerate(frames):
+        frame[20:30, 10 + 2 * i:20 + 2 * i] = 255
+    return background, frames
+
+
+def test_roi_tracker_with_background():
+    background, frames = make_frames()
+    tracker = ROITracker(BackgroundContourDetector(BackgroundModel(background), threshold=50, n=1))
+    for i, frame in enumerate(frames):
+        x, y, angle = tracker.track(frame)
+        assert (x, y) == pytest.approx((14.5 + 2 * i, 24.5), abs=0.5)
+    assert tracker.n_full_frame == 1
+
+
+def test_preprocess_reuses_buffer():
+    background, frames = make_frames()
+    detector = BackgroundContourDetector(BackgroundModel(background), threshold=50)
+    detector.preprocess(frames[:4])
+    buffer = detector._buffer
+    for image, offset in [(frames[0], (0, 0)), (frames[1, 10:20, 30:50], (30, 10)), (frames[2, 5:40, 0:25], (0, 5)),
+                          (frames[:2, 10:30, 20:60], (20, 10))]:
+        out = detector.preprocess(image, offset)
+        assert np.array_equal(out, detector.background.subtract(image, offset=offset))
+        assert np.shares_memory(out, buffer)
+    assert detector._buffer is buffer
+
+
+def test_subtract_shape_mismatch():
+    background, frames = make_frames()
+    model = BackgroundModel(background)
+    assert np.array_equal(model.subtract(frames[0, 10:20, 30:50], offset=(30, 10)),
+                          model.subtract(frames[0])[10:20, 30:50])
+    with pytest.raises(ValueError):
+        model.subtract(frames[0, 10:20, 30:50], offset=(70, 10))
+
+
+def test_sidecar(tmp_path):
+    path = tmp_path / 'video.avi'
+    path.write_bytes(b'video')
+    background, frames = make_frames()
+    assert BackgroundModel.load(path) is None
+    BackgroundModel(background).save(path)
+    assert np.array_equal(BackgroundModel.load(path).background, background)
+    path.write_bytes(b'another video')
+    assert BackgroundModel.load(path) is None
+
+
+def test_pyramid_error_subtracts_background():
+    background, frames = make_frames()
+    background[::8, 50::8] = 255  # single bright pixels that are lost when downsampling unless subtracted
+    frames[:, ::8, 50::8] = 255
+    detector = BackgroundContourDetector(BackgroundModel(background), threshold=150)
+    error = detector.pyramid_error(frames, levels=1)
+    assert error['mismatched_frames'] == 0
+    assert error['position_error_max'] < 1
@@ -0,0 +1,32 @@
+from video_analysis_toolbox.benchmarks import make_array
+from video_analysis_toolbox.image_processing.contours import ContourDetector
+from video_analysis_toolbox.tracking import BatchTracker
+from video_analysis_toolbox.video.pool import capture_pool
+import numpy as np
+import pytest
+
+
+def test_videos_with_the_same_name(tmp_path):
+    tmp_path.joinpath('a').mkdir()
+    tmp_path.joinpath('b').mkdir()
+    a = make_array(tmp_path.joinpath('a', 'rec.npy'), n_frames=20, shape=(64, 48), seed=0)
+    b = make_array(tmp_path.joinpath('b', 'rec.npy'), n_frames=30, shape=(64, 48), seed=1)
+    outputs = BatchTracker(ContourDetector(100, n=1), n_workers=0).run([a, b], tmp_path.joinpath('out'))
+    assert outputs[str(a)] != outputs[str(b)]
+    assert np.load(outputs[str(a)]).shape == (20, 1)
+    assert np.load(outputs[str(b)]).shape == (30, 1)
+    assert not list(tmp_path.joinpath('out').rglob('*.parts'))
+
+
+def test_duplicate_keys():
+    with pytest.raises(ValueError):
+        BatchTracker.keys(['a/rec.avi', 'a/rec.npy'])
+
+
+def test_tasks_do_not_keep_videos_open(tmp_path, video_path):
+    array = make_array(tmp_path.joinpath('rec.npy'), n_frames=20, shape=(64, 48), seed=0)
+    tracker = BatchTracker(ContourDetector(100, n=1), n_workers=0, frames_per_task=50)
+    n_open = len(capture_pool)
+    tasks, parts = tracker._tasks(tracker.keys([video_path, array]), tmp_path.joinpath('out'))
+    assert len(capture_pool) == n_open
+    assert [(first, last) for path, first, last, part in tasks] == [(0, 50), (50, 100), (100, 120), (0, 20)]
@@ -0,0 +1,24 @@
+from video_analysis_toolbox.video import Video
+from video_analysis_toolbox.video.cache import FrameCache
+import numpy as np
+
+
+def test_cached_frames_are_writable(video_path, reference):
+    video = Video.open(video_path, cache_size=10 ** 6)
+    for f in (3, 3):  # decoded, then served from the cache
+        frame = video.grab_frame(f)
+        assert frame.flags.writeable
+        frame[:] = 0
+    assert np.array_equal(video.grab_frame(3), reference[3])
+    assert video.frame_cache.stats['hits'] == 2
+    video.release()
+
+
+def test_eviction():
+    cache = FrameCache(3 * 100)
+    for f in range(4):
+        cache.put(f, np.full((10, 10), f, dtype='uint8'))
+    assert (0 not in cache) and (len(cache) == 3) and (cache.nbytes == 300)
+    cache.get(1)
+    cache.put(4, np.zeros((10, 10), dtype='uint8'))
+    assert (1 in cache) and (2 not in cache)
@@ -0,0 +1,26 @@
+from video_analysis_toolbox.video import Video
+import numpy as np
+import pytest
+
+
+@pytest.mark.parametrize('kwargs', [dict(), dict(import_frames=True)])
+def test_iter_chunks(video_path, reference, kwargs):
+    video = Video.open(video_path, **kwargs)
+    chunks = [(start, stop, frames.copy()) for start, stop, frames in video.iter_chunks(10, 75, chunk_size=20)]
+    assert [(start, stop) for start, stop, frames in chunks] == [(10, 30), (30, 50), (50, 70), (70, 75)]
+    assert np.array_equal(np.concatenate([frames for start, stop, frames in chunks]), reference[10:75])
+
+
+def test_iter_chunks_reuses_buffer(video_path):
+    video = Video.open(video_path)
+    buffers = {frames.__array_interface__['data'][0] for start, stop, frames in video.iter_chunks(0, 100, 30)}
+    assert len(buffers) == 1
+    video.release()
+
+
+@pytest.mark.parametrize('kwargs', [dict(), dict(import_frames=True)])
+def test_export(video_path, reference, tmp_path, kwargs):
+    video = Video.open(video_path, **kwargs)
+    exported = video.export(tmp_path / 'video.npy', chunk_size=30, roi=((5, 4), (20, 30)), first_frame=7)
+    assert np.array_equal(exported.frames, reference[7:, 4:31, 5:21])
+    assert np.array_equal(np.load(tmp_path / 'video.npy'), reference[7:, 4:31, 5:21])
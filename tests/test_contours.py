@@ -0,0 +1,86 @@
+from video_analysis_toolbox.image_processing.contours import find_contours, find_contours_pyramid, \
+    find_contours_batch, contour_info, contour_info_batch, label_info, mask, Masker
+import cv2
+import numpy as np
+import pytest
+
+
+def same_contours(a, b):
+    return (len(a) == len(b)) and all(np.array_equal(x, y) for x, y in zip(a, b))
+
+
+def make_frames(n=8, shape=(60, 80), seed=0):
+    """Frames with a few ellipses of random size, position, orientation and brightness on a noisy background."""
+    rng = np.random.default_rng(seed)
+    frames = rng.integers(0, 60, (n,) + shape).astype('uint8')
+    for frame in frames:
+        for i in range(rng.integers(0, 4)):
+            centre = (int(rng.integers(10, shape[1] - 10)), int(rng.integers(10, shape[0] - 10)))
+            axes = (int(rng.integers(3, 10)), int(rng.integers(2, 6)))
+            cv2.ellipse(frame, centre, axes, float(rng.uniform(0, 180)), 0, 360, int(rng.integers(120, 256)), -1)
+    return frames
+
+
+@pytest.mark.parametrize('n', [-1, 0, 1, 2])
+@pytest.mark.parametrize('invert', [False, True])
+def test_batch_matches_single_frames(n, invert):
+    frames = make_frames()
+    threshold = 30 if invert else 100
+    contours, areas = find_contours_batch(frames, threshold, n, invert, return_areas=True)
+    assert len(contours) == len(areas) == len(frames)
+    for frame, frame_contours, frame_areas in zip(frames, contours, areas):
+        expected = find_contours(frame, threshold, n, invert)
+        assert same_contours(frame_contours, expected)
+        assert np.array_equal(frame_areas, [cv2.contourArea(c) for c in expected])
+
+
+@pytest.mark.parametrize('levels', [1, 2])
+def test_pyramid_separates_objects_that_merge_when_downsampled(levels):
+    image = np.zeros((64, 96), dtype='uint8')
+    image[20:40, 20:40] = 255
+    image[20:40, 42:62] = 255  # 2 pixel gap
+    image[50:60, 80:90] = 255
+    full = find_contours(image, 127)
+    assert len(full) == 3
+    assert same_contours(find_contours_pyramid(image, 127, levels=levels), full)
+    assert same_contours(find_contours_pyramid(image, 127, n=2, levels=levels), full[:2])
+
+
+def test_contour_info_batch_matches_contour_info():
+    contours = [c for frame in make_frames() for c in find_contours(frame, 30, invert=True)]
+    contours.append(np.array([[[5, 5]], [[9, 5]]], dtype='int32'))  # zero area
+    info = contour_info_batch(contours)
+    for contour, features in zip(contours, info):
+        assert tuple(features) == pytest.approx(tuple(contour_info(contour)), abs=1e-9)
+    with pytest.raises(ValueError):
+        contour_info_batch(contours, out=np.empty(3, dtype=info.dtype))
+
+
+def test_label_info_matches_contour_info():
+    image = np.zeros((80, 120), dtype='uint8')
+    ellipses = [((30, 25), (15, 6), 30), ((85, 30), (20, 8), -60), ((60, 60), (12, 5), 90)]
+    for centre, axes, angle in ellipses:
+        cv2.ellipse(image, centre, axes, angle, 0, 360, 255, -1)
+    n_labels, labels = cv2.connectedComponents(image)  # including the background
+    info = label_info(labels, n_labels)  # one more label than present
+    assert np.isnan(info[-1]['x'])
+    info = np.sort(info[:-1], order='x')
+    expected = sorted(contour_info(c) for c in find_contours(image, 127))
+    assert len(info) == len(expected) == len(ellipses)
+    for features, (x, y, angle) in zip(info, expected):
+        assert (features['x'], features['y']) == pytest.approx((x, y), abs=0.1)
+        assert features['angle'] == pytest.approx(angle, abs=0.02)
+    assert [(round(x), round(y)) for x, y in zip(info['x'], info['y'])] == sorted(c for c, axes, a in ellipses)
+
+
+@pytest.mark.parametrize('equalize', [False, True])
+def test_masker_matches_mask(equalize):
+    masker = Masker()
+    frames = make_frames(12, seed=1)
+    for frame in list(frames) + [frames[0, :40, :50], frames[1]]:  # including a change of shape
+        contours = find_contours(frame, 100)
+        expected_mask, expected_masked = mask(frame, contours, equalize)
+        result_mask, result_masked = masker(frame, contours, equalize)
+        assert result_mask.dtype == bool
+        assert np.array_equal(result_mask, expected_mask)
+        assert np.array_equal(result_masked, expected_masked)
@@ -0,0 +1,33 @@
+from video_analysis_toolbox.image_processing.cropping import BatchCropper, crop_centred
+from video_analysis_toolbox.utilities.data_structures import feature_dtype
+from video_analysis_toolbox.video import Video
+import numpy as np
+import pytest
+
+
+def make_features(n, seed=0):
+    rng = np.random.default_rng(seed)
+    features = np.zeros(n, dtype=feature_dtype)
+    features['x'] = rng.uniform(-5, 70, n)  # partly outside the 64x48 frames
+    features['y'] = rng.uniform(-5, 50, n)
+    features['angle'] = rng.uniform(-np.pi / 2, np.pi / 2, n)
+    features[3] = np.nan
+    return features
+
+
+@pytest.mark.parametrize('rotate', [False, True])
+def test_crop_video(video_path, reference, tmp_path, rotate):
+    features = make_features(50)
+    cropper = BatchCropper((16, 12), rotate=rotate, fill=7)
+    expected = np.array([crop_centred(reference[7 + i], (x, y), (16, 12), angle if rotate else None, fill=7)
+                         for i, (x, y, angle) in enumerate(features)])
+    video = Video.open(video_path)
+    crops = cropper.crop_video(video, features, first_frame=7, chunk_size=13)
+    assert np.array_equal(crops, expected)
+    assert np.all(crops[3] == 7)
+    crops = cropper.crop_video(video, features, path=tmp_path / 'crops.npy', first_frame=7, chunk_size=13)
+    assert np.array_equal(crops, expected)
+    assert np.array_equal(np.load(tmp_path / 'crops.npy'), expected)
+    with pytest.raises(ValueError):
+        cropper.crop_video(video, features, first_frame=7, out=np.empty((10, 12, 16), dtype='uint8'))
+    video.release()
@@ -0,0 +1,20 @@
+from video_analysis_toolbox.video import Video
+import numpy as np
+import pytest
+
+pytest.importorskip('PyQt5')
+from video_analysis_toolbox.gui.widgets.image_view import to_qimage  # noqa: E402
+
+
+@pytest.mark.parametrize('kwargs', [dict(), dict(prefetch=4), dict(decode_threads=2)])
+def test_frames_are_shown_without_copying(video_path, reference, kwargs):
+    video = Video.open(video_path, **kwargs)
+    frames = [video.grab_frame(10), video.advance_frame()] + list(video.return_frames(20, 30))
+    video.release()
+    for frame in frames:
+        assert frame.flags.c_contiguous
+        qimage, array = to_qimage(frame)
+        assert np.shares_memory(array, frame)
+        assert (qimage.width(), qimage.height()) == frame.shape[::-1]
+    assert np.array_equal(frames[0], reference[10])
+    assert np.array_equal(np.array(frames[2:]), reference[20:30])
@@ -0,0 +1,61 @@
+from video_analysis_toolbox.video import Video
+from video_analysis_toolbox.video.pool import CapturePool
+import numpy as np
+import threading
+
+
+def open_videos(path, n, pool):
+    videos = [Video.open(path) for i in range(n)]
+    for video in videos:
+        video.capture_pool = pool
+    return videos
+
+
+def test_open_is_lazy(video_path):
+    pool = CapturePool()
+    videos = open_videos(video_path, 5, pool)
+    assert len(pool) == 0 and all(video._cap is None for video in videos)
+
+
+def test_least_recently_used_is_released(video_path, reference):
+    pool = CapturePool(max_open=2)
+    a, b, c = open_videos(video_path, 3, pool)
+    a.grab_frame(5)
+    b.grab_frame(6)
+    c.grab_frame(7)
+    assert (a._cap is None) and (len(pool) == 2)
+    assert np.array_equal(a.advance_frame(), reference[6])  # reopened at the same position
+
+
+def test_busy_video_is_not_released(video_path):
+    pool = CapturePool()
+    video, = open_videos(video_path, 1, pool)
+    video.grab_frame(0)
+    with video._lock:
+        thread = threading.Thread(target=pool.release_idle, args=(0,))
+        thread.start()
+        thread.join()
+        assert video._cap is not None
+    pool.release_idle(0)
+    assert (video._cap is None) and (len(pool) == 0)
+
+
+def test_release_while_reading(video_path, reference):
+    pool = CapturePool()
+    video, = open_videos(video_path, 1, pool)
+    stop = threading.Event()
+
+    def release():
+        while not stop.is_set():
+            pool.release_idle(0)
+
+    thread = threading.Thread(target=release)
+    thread.start()
+    try:
+        rng = np.random.default_rng(1)
+        for f in rng.integers(0, len(reference) - 1, 30):
+            assert np.array_equal(video.grab_frame(f), reference[f])
+            assert np.array_equal(video.advance_frame(), reference[f + 1])
+    finally:
+        stop.set()
+        thread.join()
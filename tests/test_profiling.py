@@ -0,0 +1,10 @@
+from video_analysis_toolbox.utilities import Profiler
+
+
+def test_percentiles_within_range():
+    profiler = Profiler()
+    for seconds in (0.0012, 0.0013, 0.0011, 0.0015):
+        profiler.record('stage', seconds)
+    s = profiler.summary()['stages']['stage']
+    assert s['min'] <= s['p50'] <= s['p90'] <= s['p99'] <= s['max']
+    assert s['p99'] == s['max']
@@ -0,0 +1,64 @@
+from video_analysis_toolbox.tracking import ResultsStore
+from video_analysis_toolbox.utilities.data_structures import feature_dtype
+import numpy as np
+import pytest
+
+
+def make_results(frames, n_objects=2):
+    results = np.zeros((len(frames), n_objects), dtype=feature_dtype)
+    for name in feature_dtype.names:
+        results[name] = np.asarray(frames)[:, None] + np.arange(n_objects)
+    return results
+
+
+def test_round_trip(tmp_path):
+    frames = np.arange(25)
+    results = make_results(frames)
+    with ResultsStore(tmp_path, n_objects=2, buffer_size=10) as store:
+        store.append('video', frames[:13], results[:13])
+        for f in frames[13:]:
+            store.append('video', f, results[f])
+    assert len(list((tmp_path / 'video').glob('*.npz'))) == 3
+    store = ResultsStore(tmp_path, n_objects=2)
+    read_frames, read_results = store.read('video')
+    assert np.array_equal(read_frames, frames)
+    assert np.array_equal(read_results, results)
+    read_frames, read_results = store.read('video', 8, 12, columns=[feature_dtype.names[0]])
+    assert np.array_equal(read_frames, frames[8:12])
+    assert np.array_equal(read_results[feature_dtype.names[0]], results[8:12][feature_dtype.names[0]])
+    with pytest.raises(ValueError):
+        store.append('../video', 0, results[0])
+
+
+def test_resume(tmp_path):
+    frames = np.arange(20)
+    results = make_results(frames)
+    with ResultsStore(tmp_path, n_objects=2) as store:
+        store.append('video', frames[:12], results[:12])
+    # a second run continues the numbering of the chunks and overrides frames that were tracked again
+    results['x'][10:] += 100
+    with ResultsStore(tmp_path, n_objects=2) as store:
+        store.append('video', frames[10:], results[10:])
+        store.flush()
+        store.append('another', frames[:5], results[:5])
+    names = sorted(path.name for path in (tmp_path / 'video').glob('*.npz'))
+    assert [name.split('_')[2] for name in names] == ['000000.npz', '000001.npz']
+    store = ResultsStore(tmp_path, n_objects=2)
+    assert store.keys() == ['another', 'video']
+    read_frames, read_results = store.read('video')
+    assert np.array_equal(read_frames, frames)
+    assert np.array_equal(read_results, results)
+    store.compact('video')
+    assert len(list((tmp_path / 'video').glob('*.npz'))) == 1
+    assert np.array_equal(store.read('video')[1], results)
+
+
+def test_temporary_files_of_other_stores_are_kept(tmp_path):
+    (tmp_path / 'video').mkdir()
+    tmp = tmp_path / 'video' / '0000000000_0000000009_000000.npz.0123456789ab.tmp'
+    tmp.write_bytes(b'being written by another store')
+    with ResultsStore(tmp_path, n_objects=2) as store:
+        store.append('video', np.arange(5), make_results(np.arange(5)))
+    assert tmp.exists()
+    assert len(store.read('video')[0]) == 5
+    assert not [path for path in (tmp_path / 'video').glob('*.tmp') if path != tmp]
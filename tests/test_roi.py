@@ -0,0 +1,53 @@
+from video_analysis_toolbox.image_processing.contours import ContourDetector, find_contours
+from video_analysis_toolbox.tracking.roi import ROITracker
+import numpy as np
+import pytest
+
+
+def square(x, y, size=10, shape=(100, 150)):
+    image = np.zeros(shape, dtype='uint8')
+    image[max(y, 0):y + size, max(x, 0):x + size] = 255
+    return image
+
+
+def same_contours(a, b):
+    return (len(a) == len(b)) and all(np.array_equal(c, d) for c, d in zip(a, b))
+
+
+def test_window_is_searched_while_object_moves_slowly():
+    tracker = ROITracker(ContourDetector(127, n=1), pad=(10, 10))
+    for i in range(20):
+        image = square(20 + 3 * i, 30 + i)
+        assert same_contours(tracker.find_contours(image), find_contours(image, 127, 1))
+    assert tracker.n_frames == 20
+    assert tracker.n_full_frame == 1
+
+
+def test_object_leaving_the_window():
+    tracker = ROITracker(ContourDetector(127, n=1), pad=(10, 10))
+    tracker.find_contours(square(20, 30))
+    image = square(100, 70)  # jumps out of the window
+    assert same_contours(tracker.find_contours(image), find_contours(image, 127, 1))
+    assert tracker.n_full_frame == 2
+    assert tracker.track(np.zeros_like(image)) is None  # disappears
+    assert tracker.n_full_frame == 3
+    x, y, angle = tracker.track(square(50, 50))  # and reappears
+    assert (x, y) == pytest.approx((54.5, 54.5))
+    assert tracker.n_full_frame == 4
+
+
+def test_object_touching_the_edge_of_the_window():
+    tracker = ROITracker(ContourDetector(127, n=1), pad=(10, 10))
+    tracker.find_contours(square(20, 30))
+    image = square(15, 25, size=40)  # grows beyond the window
+    contours = tracker.find_contours(image)
+    assert tracker.n_full_frame == 2
+    assert same_contours(contours, find_contours(image, 127, 1))
+
+
+def test_object_at_the_edge_of_the_image():
+    tracker = ROITracker(ContourDetector(127, n=1), pad=(10, 10))
+    for x in (-5, -4, -3):  # partly outside the image, so it touches the image edge but not a window edge
+        image = square(x, 0)
+        assert same_contours(tracker.find_contours(image), find_contours(image, 127, 1))
+    assert tracker.n_full_frame == 1
@@ -0,0 +1,45 @@
+from video_analysis_toolbox.benchmarks import make_video
+from video_analysis_toolbox.video import Video
+import numpy as np
+import pytest
+
+
+@pytest.mark.parametrize('kwargs', [dict(), dict(prefetch=4), dict(cache_size=10 ** 6),
+                                    dict(prefetch=4, cache_size=10 ** 6), dict(seek_index=False)])
+def test_grab_then_advance(video_path, reference, kwargs):
+    video = Video.open(video_path, **kwargs)
+    rng = np.random.default_rng(0)
+    for f in rng.integers(0, len(reference) - 2, 50):
+        assert np.array_equal(video.grab_frame(f), reference[f])
+        assert np.array_equal(video.advance_frame(), reference[f + 1])
+        assert np.array_equal(video.advance_frame(), reference[f + 2])
+    video.release()
+
+
+@pytest.mark.parametrize('kwargs', [dict(), dict(prefetch=4)])
+def test_short_jumps(video_path, reference, kwargs):
+    video = Video.open(video_path, **kwargs)
+    video.set_frame(0)
+    for f in range(3):
+        video.advance_frame()
+    for f in (5, 9, 30, 31, 20, 0, 63):
+        assert np.array_equal(video.grab_frame(f), reference[f])
+        assert np.array_equal(video.advance_frame(), reference[f + 1])
+    video.release()
+
+
+def test_seek_policy(tmp_path, counting):
+    path = make_video(tmp_path / 'intra.avi', n_frames=100, shape=(64, 48), fourcc='MJPG')
+    if path is None:
+        pytest.skip('MJPG codec not available')
+    video = Video.open(path)
+    video.grab_frame(0)
+    cap = counting(video)
+    jump = video.max_decode_forward
+    video.grab_frame(jump)  # every frame is a keyframe, but seeking would skip no more than max_decode_forward frames
+    assert (cap.seeks, cap.grabs) == (0, jump - 1)
+    video.grab_frame(3 * jump)  # far enough ahead to seek
+    assert (cap.seeks, cap.grabs) == (1, jump - 1)
+    video.grab_frame(2)  # backwards
+    assert (cap.seeks, cap.grabs) == (2, jump - 1)
+    video.release()
@@ -0,0 +1,40 @@
+from video_analysis_toolbox.image_processing.contours import ContourDetector
+from video_analysis_toolbox.tracking.sparse import SparseTracker
+from video_analysis_toolbox.video import Video
+import cv2
+import numpy as np
+import pytest
+
+
+def write_video(path, positions, fourcc='MJPG'):
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*fourcc), 100., (64, 48), False)
+    if not writer.isOpened():
+        pytest.skip(f'{fourcc} codec not available')
+    for x in positions:
+        frame = np.zeros((48, 64), dtype='uint8')
+        frame[20:28, x:x + 8] = 255
+        writer.write(frame)
+    writer.release()
+    return path
+
+
+def test_still_video_skips_decoding(tmp_path, counting):
+    video = Video.open(write_video(tmp_path / 'still.avi', [10] * 300))
+    video.grab_frame(0)
+    cap = counting(video)
+    step = 2 * video.max_decode_forward
+    tracker = SparseTracker(ContourDetector(128, n=1), step=step)
+    features = tracker.track(video)
+    assert np.allclose(features['x'], 13.5, atol=0.5)
+    assert tracker.n_analyzed == len(range(0, 299, step)) + 1
+    assert cap.grabs < video.max_decode_forward  # only the last, shorter step decodes forward
+    assert cap.reads == tracker.n_analyzed
+
+
+def test_moving_object(tmp_path):
+    positions = [10] * 100 + list(range(10, 40)) + [40] * 100
+    video = Video.open(write_video(tmp_path / 'moving.avi', positions))
+    tracker = SparseTracker(ContourDetector(128, n=1), step=10)
+    features = tracker.track(video)
+    assert np.allclose(features['x'][:, 0], np.array(positions) + 3.5, atol=0.5)
+    assert tracker.n_analyzed < len(positions) / 2
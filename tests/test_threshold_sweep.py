@@ -0,0 +1,54 @@
+from video_analysis_toolbox.image_processing.threshold_sweep import ThresholdGrid, ThresholdSweep
+from video_analysis_toolbox.utilities import TrackingError
+from video_analysis_toolbox.video import Video
+import numpy as np
+
+
+class Tracker:
+    """Succeeds if any pixel lies between thresh2 and thresh1."""
+
+    thresh1 = 100
+    thresh2 = 50
+
+    def apply_thresholds(self, image):
+        n = np.count_nonzero((image > self.thresh2) & (image < self.thresh1))
+        if not n:
+            raise TrackingError('no pixels between thresholds')
+        return dict(n=n)
+
+
+def test_grid_matches_tracker():
+    image = np.arange(256, dtype='uint8').reshape(16, 16)
+    tracker = Tracker()
+    grid = ThresholdGrid(tracker, step=32)
+    results = grid.compute(image)
+    assert set(results) == set(grid.pairs)
+    assert all(t2 < t1 for t1, t2 in results)
+    for (t1, t2), frame_info in results.items():
+        tracker_copy = Tracker()
+        tracker_copy.thresh1, tracker_copy.thresh2 = t1, t2
+        try:
+            expected = tracker_copy.apply_thresholds(image)
+        except TrackingError:
+            assert isinstance(frame_info, TrackingError)
+        else:
+            assert frame_info == expected
+    assert (tracker.thresh1, tracker.thresh2) == (100, 50)  # the tracker itself is not modified
+    assert grid.snap(100) == 96
+    assert grid.compute(image, cancel=lambda: True) is None
+
+
+def test_sweep(video_path):
+    grid = ThresholdGrid(Tracker(), step=32)
+    video = Video.open(video_path)
+    sweep = ThresholdSweep(video, grid, n_samples=4)
+    assert sweep.complete
+    assert len(sweep.frames) == 4
+    for i, f in enumerate(sweep.frames):
+        results = grid.compute(video.grab_frame(f))
+        for (t1, t2), frame_info in results.items():
+            assert sweep.tracked[i, t1 // 32, t2 // 32] == (not isinstance(frame_info, TrackingError))
+    video.release()
+    rate = sweep.detection_rate
+    assert np.isnan(rate[0, 0]) and np.isnan(rate[1, 2])
+    assert sweep.summary(100, 40)['detection_rate'] == rate[3, 1]
@@ -0,0 +1,2 @@
+from .synthetic import synthetic_frames, make_video, make_array
+from .suite import run, save, load, compare
@@ -0,0 +1,23 @@
+from . import run, save, load, compare
+import argparse
+import json
+
+
+parser = argparse.ArgumentParser(prog='python -m video_analysis_toolbox.benchmarks',
+                                 description='Benchmarks decoding, seeking and tracking on synthetic videos.')
+parser.add_argument('-o', '--output', help='path of a json file to save the results')
+parser.add_argument('-c', '--compare', help='path of a json file with previous results to compare against')
+parser.add_argument('-d', '--directory', help='directory for the synthetic videos (temporary by default)')
+parser.add_argument('-n', '--n_frames', type=int, default=500, help='number of frames in each video')
+parser.add_argument('--width', type=int, default=640)
+parser.add_argument('--height', type=int, default=480)
+args = parser.parse_args()
+
+results = run(args.directory, args.n_frames, (args.width, args.height))
+if args.output:
+    save(results, args.output)
+if args.compare:
+    for name, speedup in compare(load(args.compare), results).items():
+        print(f'{name:40s} {speedup:6.2f}x')
+else:
+    print(json.dumps(results, indent=2))
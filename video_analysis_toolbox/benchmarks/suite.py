@@ -0,0 +1,143 @@
+from ..video import Video
+from ..image_processing.contours import find_contours, contour_info, mask
+from ..image_processing.cropping import crop_to_contour
+from .synthetic import make_video, make_array
+from .timing import time_calls, time_throughput
+import cv2
+import datetime
+import json
+import numpy as np
+from pathlib import Path
+import platform
+import tempfile
+
+
+# name: (fourcc, suffix, open keyword arguments); fourcc is None for numpy arrays
+BACKENDS = {
+    'avi': ('XVID', '.avi', dict()),
+    'h264': ('H264', '.avi', dict()),
+    'npy': (None, '.npy', dict()),
+    'npy_mmap': (None, '.npy', dict(mmap=True)),
+}
+
+
+def generate(directory, n_frames=500, shape=(640, 480)) -> dict:
+    """Writes a synthetic video for each backend into a directory. Returns a dict of paths (None for backends whose
+    codec is not available)."""
+    directory = Path(directory)
+    paths = {}
+    for name, (fourcc, suffix, kwargs) in BACKENDS.items():
+        if fourcc is None:
+            path = directory.joinpath('synthetic' + suffix)
+            paths[name] = path if path.exists() else make_array(path, n_frames, shape)
+        else:
+            paths[name] = make_video(directory.joinpath(f'synthetic_{fourcc}{suffix}'), n_frames, shape, fourcc)
+    return paths
+
+
+def benchmark_decode(video) -> dict:
+    """Sequential decoding throughput (advance_frame) over the whole video."""
+    video.set_frame(0)
+    return time_throughput(video.advance_frame, video.frame_count)
+
+
+def benchmark_seek(video, n_seeks=100, seed=0) -> dict:
+    """Latency of grab_frame for frames in random order."""
+    frames = np.random.default_rng(seed).integers(0, video.frame_count, n_seeks)
+    return time_calls(video.grab_frame, frames)
+
+
+def benchmark_processing(frames, threshold=100) -> dict:
+    """Per-frame cost of finding, measuring, masking and cropping to the largest contour in each frame."""
+    contours = [find_contours(frame, threshold, n=1) for frame in frames]
+    pairs = [(frame, c[0]) for frame, c in zip(frames, contours) if len(c)]
+    return dict(find_contours=time_calls(lambda frame: find_contours(frame, threshold), frames),
+                find_largest_contour=time_calls(lambda frame: find_contours(frame, threshold, n=1), frames),
+                contour_info=time_calls(lambda pair: contour_info(pair[1]), pairs),
+                mask=time_calls(lambda pair: mask(pair[0], [pair[1]]), pairs),
+                crop_to_contour=time_calls(lambda pair: crop_to_contour(pair[0], pair[1], pad=(20, 20)), pairs))
+
+
+def run(directory=None, n_frames=500, shape=(640, 480), n_seeks=100, n_process=200, threshold=100) -> dict:
+    """Runs the benchmark suite on synthetic videos.
+
+    Parameters
+    ----------
+    directory : str or Path (optional)
+        Where to write the synthetic videos (a temporary directory by default). Existing videos are reused.
+    n_frames : int (default = 500)
+        Number of frames in each synthetic video.
+    shape : tuple (width, height) (default = (640, 480))
+        Size of the frames.
+    n_seeks : int (default = 100)
+        Number of random frames accessed in the seek benchmark.
+    n_process : int (default = 200)
+        Number of frames used for the image processing benchmarks.
+    threshold : int (default = 100)
+        Threshold for finding contours in the synthetic frames.
+
+    Returns
+    -------
+    dict
+        Metadata about the run and the results of each benchmark. Times are in seconds.
+    """
+    if directory is None:
+        with tempfile.TemporaryDirectory() as directory:
+            return run(directory, n_frames, shape, n_seeks, n_process, threshold)
+    paths = generate(directory, n_frames, shape)
+    benchmarks = {}
+    for name, path in paths.items():
+        if path is None:
+            benchmarks[name] = dict(skipped=f'{BACKENDS[name][0]} codec not available')
+            continue
+        video = Video.open(path, **BACKENDS[name][2])
+        benchmarks[name] = dict(backend=type(video).__name__,
+                                decode=benchmark_decode(video),
+                                seek=benchmark_seek(video, n_seeks))
+        if hasattr(video, 'release'):
+            video.release()
+    frames = np.load(paths['npy'], mmap_mode='r')[:n_process]
+    benchmarks['processing'] = benchmark_processing(np.array(frames), threshold)
+    metadata = dict(date=datetime.datetime.now().isoformat(timespec='seconds'),
+                    python=platform.python_version(),
+                    platform=platform.platform(),
+                    processor=platform.processor(),
+                    numpy=np.__version__,
+                    opencv=cv2.__version__,
+                    n_frames=n_frames,
+                    shape=list(shape))
+    return dict(metadata=metadata, benchmarks=benchmarks)
+
+
+def save(results, path):
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
+
+
+def load(path) -> dict:
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def _flatten(benchmarks, prefix=()):
+    """Yields (name, value) pairs for the headline number of each benchmark: median latency or throughput."""
+    for key, value in benchmarks.items():
+        if not isinstance(value, dict):
+            continue
+        if 'median' in value:
+            yield '.'.join(prefix + (key,)), ('median', value['median'])
+        elif 'per_second' in value:
+            yield '.'.join(prefix + (key,)), ('per_second', value['per_second'])
+        else:
+            yield from _flatten(value, prefix + (key,))
+
+
+def compare(old, new) -> dict:
+    """Compares two sets of results (see run). Returns the speed up of each benchmark found in both (values > 1 mean
+    that new is faster than old)."""
+    old, new = dict(_flatten(old['benchmarks'])), dict(_flatten(new['benchmarks']))
+    speedups = {}
+    for name in old.keys() & new.keys():
+        (metric, a), (_, b) = old[name], new[name]
+        speedups[name] = (b / a) if metric == 'per_second' else (a / b)
+    return dict(sorted(speedups.items()))
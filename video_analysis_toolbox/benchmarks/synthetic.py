@@ -0,0 +1,71 @@
+import cv2
+import numpy as np
+from pathlib import Path
+
+
+def synthetic_frames(n_frames=500, shape=(640, 480), n_objects=1, seed=0):
+    """Generates frames of bright elliptical objects swimming over a noisy dark background.
+
+    Parameters
+    ----------
+    n_frames : int (default = 500)
+        Number of frames.
+    shape : tuple (width, height) (default = (640, 480))
+        Size of each frame.
+    n_objects : int (default = 1)
+        Number of objects in each frame.
+    seed : int (default = 0)
+        Seed for the random number generator (videos with the same parameters are identical).
+
+    Yields
+    ------
+    frame : np.ndarray
+        Unsigned 8-bit grayscale frame.
+    """
+    w, h = shape
+    rng = np.random.default_rng(seed)
+    centres = rng.uniform((0.2 * w, 0.2 * h), (0.8 * w, 0.8 * h), (n_objects, 2))
+    angles = rng.uniform(-np.pi, np.pi, n_objects)
+    for f in range(n_frames):
+        frame = rng.integers(0, 30, (h, w), dtype=np.uint8)
+        angles += rng.normal(0, 0.1, n_objects)
+        centres += 3 * np.stack([np.cos(angles), np.sin(angles)], axis=1)
+        # bounce off the edges
+        outside = (centres < 20) | (centres > (w - 20, h - 20))
+        angles[outside[:, 0]] = np.pi - angles[outside[:, 0]]
+        angles[outside[:, 1]] = -angles[outside[:, 1]]
+        centres = np.clip(centres, 20, (w - 20, h - 20))
+        for (x, y), angle in zip(centres, angles):
+            cv2.ellipse(frame, (int(x), int(y)), (15, 5), np.degrees(angle), 0, 360, 200, -1)
+        yield frame
+
+
+def make_video(path, n_frames=500, shape=(640, 480), fourcc='XVID', frame_rate=100., **kwargs):
+    """Writes a synthetic video (see synthetic_frames) to an avi file with cv2.VideoWriter.
+
+    Returns
+    -------
+    path : Path or None
+        Path to the video, or None if the codec is not available.
+    """
+    path = Path(path)
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*fourcc), frame_rate, shape, False)
+    if not writer.isOpened():
+        return None
+    try:
+        for frame in synthetic_frames(n_frames, shape, **kwargs):
+            writer.write(frame)
+    finally:
+        writer.release()
+    return path
+
+
+def make_array(path, n_frames=500, shape=(640, 480), **kwargs):
+    """Writes a synthetic video (see synthetic_frames) to a .npy file."""
+    path = Path(path)
+    frames = np.lib.format.open_memmap(path, mode='w+', dtype=np.uint8, shape=(n_frames, shape[1], shape[0]))
+    for i, frame in enumerate(synthetic_frames(n_frames, shape, **kwargs)):
+        frames[i] = frame
+    frames.flush()
+    del frames
+    return path
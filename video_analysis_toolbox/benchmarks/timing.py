@@ -0,0 +1,46 @@
+import numpy as np
+import time
+
+
+def summarize(times) -> dict:
+    """Summary statistics (in seconds) of a set of timings."""
+    times = np.asarray(times, dtype='float64')
+    return dict(n=len(times), mean=float(times.mean()), median=float(np.median(times)), min=float(times.min()),
+                max=float(times.max()), std=float(times.std()))
+
+
+def time_calls(func, args, warmup=1):
+    """Times a function called once with each of a sequence of arguments.
+
+    Parameters
+    ----------
+    func : callable
+        Function to time.
+    args : iterable
+        Argument passed to func in each call.
+    warmup : int (default = 1)
+        Number of untimed calls (with the first argument) made before timing.
+
+    Returns
+    -------
+    dict
+        Summary statistics of the time taken by each call (see summarize).
+    """
+    args = list(args)
+    for i in range(warmup):
+        func(args[0])
+    times = np.empty(len(args))
+    for i, arg in enumerate(args):
+        t0 = time.perf_counter()
+        func(arg)
+        times[i] = time.perf_counter() - t0
+    return summarize(times)
+
+
+def time_throughput(func, n) -> dict:
+    """Times n consecutive calls to func (without arguments) and returns the number of calls per second."""
+    t0 = time.perf_counter()
+    for i in range(n):
+        func()
+    elapsed = time.perf_counter() - t0
+    return dict(n=n, total=elapsed, per_second=n / elapsed)
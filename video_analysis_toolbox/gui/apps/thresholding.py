@@ -12,26 +12,31 @@ class SetThresholdsApp(Application):
         List of paths to video files.
     tracker : Tracker
         A Tracker object.
+    cache_size : int (default = 0)
+        Size (in bytes) of the decoded frame cache of each video (0 to disable caching).
+    precompute : bool (default = False)
+        Whether to precompute the tracker's results over a grid of thresholds (see DoubleThresholdWidget).
     """
 
-    def __init__(self, videos, tracker, *args, **kwargs):
+    def __init__(self, videos, tracker, *args, cache_size=0, precompute=False, **kwargs):
         super().__init__(*args, **kwargs)
-        self.videos = [Video.open(video) for video in videos]
+        self.videos = [Video.open(video, cache_size=cache_size) for video in videos]
         self.tracker = tracker
         # Set name
         self.setWindowTitle('Set thresholds')
         # Resize window
         self.resize(800, 800)
         # Threshold widget
-        self.threshold_widget = DoubleThresholdWidget(self.videos, app=self)
+        self.threshold_widget = DoubleThresholdWidget(self.videos, app=self, precompute=precompute)
         self.centralWidget().layout().insertWidget(0, self.threshold_widget)
 
     @property
     def output(self):
         selected_videos = self.threshold_widget.selected_videos
-        thresholds = (self.tracker.thresh1, self.tracker.thresh2)
+        thresholds = self.threshold_widget.thresholds
+        self.tracker.thresh1, self.tracker.thresh2 = thresholds  # the renderer thread has stopped by now
         return selected_videos, thresholds
 
     @classmethod
-    def start(cls, videos: list, tracker):
-        return super().start(videos, tracker)
+    def start(cls, videos: list, tracker, cache_size=0, precompute=False):
+        return super().start(videos, tracker, cache_size=cache_size, precompute=precompute)
@@ -1,12 +1,34 @@
 from .video_display import VideoDisplayWidget
 from .slider import SliderWidget
+from .threshold_sweep import ThresholdSweepWidget
+from video_analysis_toolbox.image_processing.threshold_sweep import ThresholdGrid
 from video_analysis_toolbox.utilities import TrackingError
 from PyQt5 import QtCore
+import copy
 
 
 class DoubleThresholdWidget(VideoDisplayWidget):
+    """Widget for setting two thresholds of a tracker.
 
-    def __init__(self, videos, app, *args, **kwargs):
+    Parameters
+    ----------
+    videos : list
+        List of Video objects.
+    app : Application
+        The parent application, which must have a tracker attribute.
+    precompute : bool (default = False)
+        Whether to precompute the tracker's results for every pair of thresholds on a grid (see ThresholdSweepWidget).
+        The thresholds then move in steps of the grid, and slider moves are answered from the precomputed results of
+        the displayed frame as soon as they are available.
+    step : int (default = 8)
+        Spacing of the threshold grid if precompute is True.
+    n_samples : int (default = 10)
+        Number of frames sampled from each video for the threshold sweep if precompute is True.
+    """
+
+    def __init__(self, videos, app, *args, precompute=False, step=8, n_samples=10, **kwargs):
+        self.sweep_widget = None
+        self.thresh1_widget = self.thresh2_widget = None
         super().__init__(videos, app=app, *args, **kwargs)
         # Add display for thresholding
         self.add_display('Contours', self.apply_thresholds, show='contours')
@@ -18,6 +40,20 @@ class DoubleThresholdWidget(VideoDisplayWidget):
         self.thresh2_widget.value_changed.connect(self.change_thresh2)
         self.slider_widget.layout().addWidget(self.thresh1_widget)
         self.slider_widget.layout().addWidget(self.thresh2_widget)
+        # Threshold sweep
+        if precompute:
+            grid = ThresholdGrid(self.app.tracker, step)
+            self.sweep_widget = ThresholdSweepWidget(grid, n_samples)
+            self.slider_widget.layout().addWidget(self.sweep_widget)
+            self.thresh1_widget.set_range(int(grid.thresholds[1]), int(grid.thresholds[-1]))
+            self.thresh2_widget.set_range(0, int(grid.thresholds[-2]))
+            for widget in (self.thresh1_widget, self.thresh2_widget):
+                widget.slider.setSingleStep(step)
+                widget.slider.setPageStep(4 * step)
+                widget.set_value(grid.snap(widget.value))
+            self.sweep_widget.set_thresholds(*self.thresholds)
+            self.sweep_widget.set_video(self.current_video)
+            self.sweep_widget.set_frame(self.current_video, self.frame_number)
         # Make videos checkable
         for i in range(self.video_list.count()):
             item = self.video_list.item(i)
@@ -36,37 +72,80 @@ class DoubleThresholdWidget(VideoDisplayWidget):
                 selected.append(video.path)
         return selected
 
+    def _snap(self, widget, val) -> bool:
+        """Moves a slider to the nearest threshold on the grid if thresholds are precomputed. Returns True if it was
+        moved (in which case the change is handled when the slider emits the snapped value)."""
+        if (self.sweep_widget is None) or (self.sweep_widget.grid.snap(val) == val):
+            return False
+        widget.set_value(self.sweep_widget.grid.snap(val))
+        return True
+
     @QtCore.pyqtSlot(int)
     def change_thresh1(self, val):
-        """Called when thresh2 changes."""
+        """Called when thresh1 changes."""
+        if self._snap(self.thresh1_widget, val):
+            return
         thresh1 = self.thresh2_widget.value
         if thresh1 >= val:
-            self.thresh2_widget.set_value(val - 1)
+            self.thresh2_widget.set_value(val - (1 if self.sweep_widget is None else self.sweep_widget.grid.step))
         self._change_thresholds()
 
     @QtCore.pyqtSlot(int)
     def change_thresh2(self, val):
-        """Called when thresh1 changes."""
+        """Called when thresh2 changes."""
+        if self._snap(self.thresh2_widget, val):
+            return
         thresh2 = self.thresh1_widget.value
         if thresh2 <= val:
-            self.thresh1_widget.set_value(val + 1)
+            self.thresh1_widget.set_value(val + (1 if self.sweep_widget is None else self.sweep_widget.grid.step))
         self._change_thresholds()
 
     def _change_thresholds(self):
-        """Called whenever either threshold changes. Updates thresholds in parent tracker then updates the display."""
+        """Called whenever either threshold changes. Updates the display with the new thresholds (the tracker itself is
+        not changed, see apply_thresholds)."""
         thresh1, thresh2 = self.thresholds
-        self.app.tracker.thresh1 = thresh1
-        self.app.tracker.thresh2 = thresh2
-        self.update_display_image()
-        self.draw()
+        if self.sweep_widget is not None:
+            self.sweep_widget.set_thresholds(thresh1, thresh2)
+        self.request_display_image()
+
+    @QtCore.pyqtSlot()
+    def switch_video(self):
+        super().switch_video()
+        if self.sweep_widget is not None:
+            self.sweep_widget.set_video(self.current_video)
+
+    @QtCore.pyqtSlot(int)
+    def change_frame(self, frame):
+        super().change_frame(frame)
+        if self.sweep_widget is not None:
+            self.sweep_widget.set_frame(self.current_video, frame)
+
+    def render_kwargs(self) -> dict:
+        kwargs = super().render_kwargs()
+        if self.thresh1_widget is not None:
+            kwargs['thresholds'] = self.thresholds
+            if self.sweep_widget is not None:
+                kwargs['frame_info'] = self.sweep_widget.lookup(self.current_video, self.frame_number, self.thresholds)
+        return kwargs
 
-    def apply_thresholds(self, image, show='contours'):
+    def apply_thresholds(self, image, show='contours', thresholds=None, frame_info=None):
+        """Applies the tracker to an image and returns the result of its show_contours / show_tracking method (an
+        image, or a tuple (image, Overlay) to draw on top of the image, see add_display). The thresholds are applied
+        to a shallow copy of the tracker, since this runs in the renderer thread. If the frame_info (or TrackingError)
+        of the image has been precomputed, the tracker is only used to draw."""
+        tracker = self.app.tracker
+        if thresholds is not None:
+            tracker = copy.copy(tracker)
+            tracker.thresh1, tracker.thresh2 = thresholds
         try:
-            frame_info = self.app.tracker.apply_thresholds(image)
+            if isinstance(frame_info, TrackingError):
+                raise frame_info
+            if frame_info is None:
+                frame_info = tracker.apply_thresholds(image)
             if show == 'contours':
-                return self.app.tracker.show_contours(image, **frame_info)
+                return tracker.show_contours(image, **frame_info)
             elif show == 'tracking':
-                return self.app.tracker.show_tracking(image, **frame_info)
+                return tracker.show_tracking(image, **frame_info)
         except TrackingError as e:
-            self.app.statusBar().showMessage(str(e.message), 1000)  # show any error in the status bar
+            self.status_message.emit(str(e.message), 1000)  # show any error in the status bar
             return image
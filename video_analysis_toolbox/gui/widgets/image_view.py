@@ -0,0 +1,87 @@
+from PyQt5 import QtWidgets, QtCore, QtGui
+from collections import namedtuple
+import numpy as np
+
+
+# Vector graphics drawn on top of an image: a list of contours and a list of (x, y, angle) points
+Overlay = namedtuple('Overlay', ('contours', 'points'), defaults=((), ()))
+
+
+def to_qimage(image: np.ndarray) -> (QtGui.QImage, np.ndarray):
+    """Wraps an unsigned 8-bit grayscale or BGR image as a QImage without copying the pixel data (except for BGR images
+    with Qt < 5.14, which are converted to RGB).
+
+    Returns
+    -------
+    qimage : QtGui.QImage
+        Image that shares memory with the returned array.
+    array : np.ndarray
+        The pixel data, which must be kept alive for as long as the QImage is used.
+    """
+    image = np.ascontiguousarray(image, dtype=np.uint8)
+    if image.ndim == 2:
+        fmt = QtGui.QImage.Format_Grayscale8
+    elif hasattr(QtGui.QImage, 'Format_BGR888'):
+        fmt = QtGui.QImage.Format_BGR888
+    else:
+        image = np.ascontiguousarray(image[..., ::-1])
+        fmt = QtGui.QImage.Format_RGB888
+    h, w = image.shape[:2]
+    return QtGui.QImage(image.data, w, h, image.strides[0], fmt), image
+
+
+class ImageWidget(QtWidgets.QWidget):
+    """Widget that paints an image directly (scaled to fit the widget) with an optional vector overlay."""
+
+    background = QtGui.QColor(242, 242, 242)
+    contour_pen = QtGui.QPen(QtGui.QColor(255, 0, 0), 0)
+    point_pen = QtGui.QPen(QtGui.QColor(0, 255, 0), 0)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._array = None
+        self._image = None
+        self._overlay = Overlay()
+        self.setSizePolicy(QtWidgets.QSizePolicy.MinimumExpanding, QtWidgets.QSizePolicy.MinimumExpanding)
+
+    def set_image(self, image: np.ndarray, overlay: Overlay = None):
+        """Sets the image to be displayed and schedules a repaint.
+
+        Parameters
+        ----------
+        image : np.ndarray
+            Unsigned 8-bit grayscale (height, width) or BGR (height, width, 3) image.
+        overlay : Overlay (optional)
+            Contours and points to draw on top of the image (in image coordinates).
+        """
+        self._image, self._array = to_qimage(image)
+        self._overlay = Overlay() if overlay is None else overlay
+        self.update()
+
+    def _target(self) -> QtCore.QRectF:
+        """Largest rectangle with the aspect ratio of the image that fits in the widget."""
+        h, w = self._array.shape[:2]
+        scale = min(self.width() / w, self.height() / h)
+        return QtCore.QRectF((self.width() - w * scale) / 2, (self.height() - h * scale) / 2, w * scale, h * scale)
+
+    def paintEvent(self, event):
+        painter = QtGui.QPainter(self)
+        painter.fillRect(self.rect(), self.background)
+        if self._image is None:
+            return
+        target = self._target()
+        painter.drawImage(target, self._image)
+        # overlay is drawn in image coordinates with cosmetic (constant width) pens
+        painter.setRenderHint(QtGui.QPainter.Antialiasing)
+        painter.translate(target.topLeft())
+        painter.scale(target.width() / self._image.width(), target.height() / self._image.height())
+        painter.translate(0.5, 0.5)  # pixel centres
+        painter.setPen(self.contour_pen)
+        for contour in self._overlay.contours:
+            painter.drawPolygon(QtGui.QPolygonF([QtCore.QPointF(x, y) for x, y in np.reshape(contour, (-1, 2))]))
+        painter.setPen(self.point_pen)
+        for x, y, angle in self._overlay.points:
+            if np.isnan(x) or np.isnan(y):
+                continue
+            painter.drawEllipse(QtCore.QPointF(x, y), 2, 2)
+            painter.drawLine(QtCore.QPointF(x, y), QtCore.QPointF(x + 10 * np.cos(angle), y + 10 * np.sin(angle)))
@@ -0,0 +1,66 @@
+from PyQt5 import QtCore
+import threading
+
+
+class FrameRenderer(QtCore.QThread):
+    """Thread for fetching and processing frames away from the GUI thread.
+
+    Requests are coalesced: if several requests arrive while a frame is being rendered, only the latest one is rendered
+    next and the others are dropped. Rendered images are posted back to the GUI thread with the rendered signal.
+
+    Parameters
+    ----------
+    render : callable
+        Function called (in the renderer thread) with the arguments of each request. Should return the rendered image,
+        or None if nothing should be displayed.
+    """
+
+    rendered = QtCore.pyqtSignal(int, object)
+
+    def __init__(self, render, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.render = render
+        self._condition = threading.Condition()
+        self._request = None
+        self._request_id = 0
+        self._stopped = False
+
+    def request(self, *args) -> int:
+        """Requests a new image, replacing any request that has not been started yet.
+
+        Returns
+        -------
+        int
+            Id of the request (sent with the rendered image).
+        """
+        with self._condition:
+            self._request_id += 1
+            self._request = (self._request_id, args)
+            self._condition.notify()
+            return self._request_id
+
+    @property
+    def pending(self) -> bool:
+        """Whether a request is waiting to be rendered."""
+        return self._request is not None
+
+    def run(self):
+        while True:
+            with self._condition:
+                while (self._request is None) and not self._stopped:
+                    self._condition.wait()
+                if self._stopped:
+                    return
+                request_id, args = self._request
+                self._request = None
+            image = self.render(*args)
+            if image is not None:
+                self.rendered.emit(request_id, image)
+
+    @QtCore.pyqtSlot()
+    def stop(self):
+        """Stops the thread once the current request has been rendered."""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        self.wait()
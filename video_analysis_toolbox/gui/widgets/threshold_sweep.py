@@ -0,0 +1,158 @@
+from .image_view import to_qimage
+from .renderer import FrameRenderer
+from video_analysis_toolbox.image_processing.threshold_sweep import ThresholdGrid, ThresholdSweep
+from video_analysis_toolbox.video import Video
+from PyQt5 import QtWidgets, QtCore, QtGui
+from collections import OrderedDict
+import numpy as np
+import threading
+
+
+class ThresholdSweepWidget(QtWidgets.QWidget):
+    """Precomputes the results of a tracker for every pair of thresholds on a grid (see ThresholdGrid).
+
+    For the frame that is displayed, the tracker's frame_info for every pair of thresholds is computed in a background
+    thread, so that moving the threshold sliders is answered from the cached results (see lookup) instead of
+    re-running the tracker. For each video, a sweep of a sample of frames is computed once (in another background
+    thread) and plotted as a map of the fraction of frames in which the tracker succeeds with each pair of thresholds
+    (thresh1 along x, thresh2 along y, brighter is better), with the current thresholds marked.
+
+    Parameters
+    ----------
+    grid : ThresholdGrid
+        Tracker and thresholds to precompute.
+    n_samples : int (default = 10)
+        Number of frames sampled from each video for the sweep.
+    max_frames : int (default = 16)
+        Number of frames for which results are kept.
+    """
+
+    sweep_finished = QtCore.pyqtSignal(object, object)
+
+    def __init__(self, grid: ThresholdGrid, n_samples=10, max_frames=16, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.grid = grid
+        self.n_samples = n_samples
+        self.max_frames = max_frames
+        self.cancel = threading.Event()
+        self.threads = []
+        self.sweeps = {}
+        self.sweep = None
+        self.video = None
+        self.thresholds = ()
+        self.frame_results = OrderedDict()  # (id(video), frame_number) -> results of ThresholdGrid.compute
+        self._lock = threading.Lock()
+        self.frame_worker = FrameRenderer(self._compute_frame)
+        self.frame_worker.rendered.connect(self._frame_finished)
+        self.frame_worker.start()
+        QtWidgets.QApplication.instance().aboutToQuit.connect(self.stop)
+        self.setFixedHeight(100)
+        self.label = QtWidgets.QLabel('', self)
+        self.sweep_finished.connect(self._sweep_finished)
+
+    def set_video(self, video):
+        """Shows the sweep of a video, computing it in a background thread if necessary."""
+        self.video = video
+        self.sweep = self.sweeps.get(id(video))
+        if (self.sweep is None) and (id(video) not in self.sweeps):
+            self.sweeps[id(video)] = None  # computing
+            thread = threading.Thread(target=self._compute_sweep, args=(video,), daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        self._update_label()
+        self.update()
+
+    def set_frame(self, video, frame_number):
+        """Precomputes the results of every pair of thresholds for a frame (unless they are already cached). A request
+        for another frame cancels any computation that has not finished."""
+        with self._lock:
+            if (id(video), frame_number) in self.frame_results:
+                return
+        self.frame_worker.request(video, frame_number)
+
+    def lookup(self, video, frame_number, thresholds):
+        """Returns the precomputed frame_info (or TrackingError) of a frame with a pair of thresholds, or None if it
+        has not been computed (e.g. the thresholds are not on the grid)."""
+        with self._lock:
+            results = self.frame_results.get((id(video), frame_number))
+        if results is not None:
+            return results.get(tuple(thresholds))
+
+    def _compute_frame(self, video, frame_number):
+        # runs in the frame worker thread; stops as soon as another frame is requested
+        results = self.grid.compute(video.grab_frame(frame_number),
+                                    cancel=lambda: self.frame_worker.pending or self.cancel.is_set())
+        if results is not None:
+            return (id(video), frame_number), results
+
+    @QtCore.pyqtSlot(int, object)
+    def _frame_finished(self, request_id, result):
+        key, results = result
+        with self._lock:
+            self.frame_results[key] = results
+            while len(self.frame_results) > self.max_frames:
+                self.frame_results.popitem(last=False)
+
+    def _compute_sweep(self, video):
+        # use a separate handle so that the sweep does not interfere with the video display
+        path = getattr(video, 'path', None)
+        handle = Video.open(path) if path is not None else video
+        try:
+            sweep = ThresholdSweep(handle, self.grid, self.n_samples, cancel=self.cancel.is_set)
+        finally:
+            if handle is not video:
+                handle.release()
+        if not sweep.complete:
+            return
+        try:
+            self.sweep_finished.emit(video, sweep)
+        except RuntimeError:  # widget was deleted before the sweep finished
+            pass
+
+    @QtCore.pyqtSlot(object, object)
+    def _sweep_finished(self, video, sweep):
+        self.sweeps[id(video)] = sweep
+        if video is self.video:
+            self.sweep = sweep
+            self._update_label()
+            self.update()
+
+    @QtCore.pyqtSlot()
+    def stop(self):
+        """Cancels any sweeps and frames that are being computed."""
+        self.cancel.set()
+        self.frame_worker.stop()
+        for thread in self.threads:
+            thread.join()
+
+    def set_thresholds(self, thresh1, thresh2):
+        """Marks the current thresholds on the sweep."""
+        self.thresholds = (thresh1, thresh2)
+        self._update_label()
+        self.update()
+
+    def _update_label(self):
+        if self.sweep is None:
+            self.label.setText('Computing threshold sweep...')
+        elif self.thresholds:
+            s = self.sweep.summary(*self.thresholds)
+            self.label.setText(f"Thresh 1 = {s['thresh1']}, thresh 2 = {s['thresh2']}: tracked in "
+                               f"{s['detection_rate']:.0%} of {len(self.sweep.frames)} sampled frames")
+        self.label.adjustSize()
+
+    def paintEvent(self, event):
+        painter = QtGui.QPainter(self)
+        rect = QtCore.QRectF(self.rect()).adjusted(5, 20, -5, -5)
+        painter.fillRect(rect, QtGui.QColor(255, 255, 255))
+        if self.sweep is not None:
+            # detection rate with thresh1 along x and thresh2 along y (increasing upwards), pairs off the grid in grey
+            rate = self.sweep.detection_rate.T[::-1]
+            pixels = np.where(np.isnan(rate), 200, np.round(255 * np.nan_to_num(rate))).astype('uint8')
+            self._qimage, self._pixels = to_qimage(pixels)
+            painter.drawImage(rect, self._qimage)
+        if self.thresholds:
+            thresh1, thresh2 = self.thresholds
+            x = rect.left() + rect.width() * thresh1 / 255.
+            y = rect.bottom() - rect.height() * thresh2 / 255.
+            painter.setPen(QtGui.QPen(QtGui.QColor(255, 0, 0), 2))
+            painter.drawEllipse(QtCore.QPointF(x, y), 3, 3)
@@ -1,17 +1,20 @@
+from .image_view import ImageWidget, Overlay
+from .renderer import FrameRenderer
 from .slider import SliderWidget
 from video_analysis_toolbox.video import FrameErrorWarning
 from PyQt5 import QtWidgets, QtCore
-from matplotlib import pyplot as plt
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 import warnings
 
 
 class VideoDisplayWidget(QtWidgets.QWidget):
 
+    status_message = QtCore.pyqtSignal(str, int)
+
     def __init__(self, videos, app: QtWidgets.QMainWindow, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
         self.app = app
+        self.status_message.connect(self.app.statusBar().showMessage)
 
         # -----
         # SETUP
@@ -36,6 +39,7 @@ class VideoDisplayWidget(QtWidgets.QWidget):
         # Initialize display attributes
         self.display_methods = []
         self.display_image = None
+        self.display_overlay = Overlay()
 
         # Create combobox for switching between images
         self.box_widget = QtWidgets.QComboBox()
@@ -47,21 +51,21 @@ class VideoDisplayWidget(QtWidgets.QWidget):
         self.box_widget.setFixedSize(120, 25)
         self.display_widget.layout().addWidget(self.box_widget, alignment=QtCore.Qt.AlignRight)
 
-        # Create figure widget
-        self.figure = plt.figure(facecolor='0.95')
-        self.ax = self.figure.add_axes([0, 0, 1, 1])
-        self.ax.axis('off')
-        self.canvas = FigureCanvas(self.figure)
-        self.canvas.setMinimumSize(500, 500)
-        self.canvas.setSizePolicy(QtWidgets.QSizePolicy().MinimumExpanding, QtWidgets.QSizePolicy().MinimumExpanding)
-        self.display_widget.layout().addWidget(self.canvas)
+        # Create image widget
+        self.image_widget = ImageWidget()
+        self.image_widget.setMinimumSize(500, 500)
+        self.display_widget.layout().addWidget(self.image_widget)
 
         # Initialize the display
         self.update_display_image()  # initializes the display image
-        self.image_ = self.ax.imshow(self.display_image,
-                                     origin='upper',
-                                     cmap='Greys_r',
-                                     vmin=0, vmax=255)
+        self.draw()
+
+        # Frames are fetched and processed in a separate thread after initialization
+        self.renderer = FrameRenderer(self.render_image)
+        self.renderer.rendered.connect(self.rendered)
+        self.shown_request = 0
+        QtWidgets.QApplication.instance().aboutToQuit.connect(self.renderer.stop)
+        self.renderer.start()
 
         # -------
         # SLIDERS
@@ -116,14 +120,22 @@ class VideoDisplayWidget(QtWidgets.QWidget):
         return w
 
     def add_display(self, name, func, **kwargs):
+        """Adds a display method. The function is called with the current frame (and kwargs) and should return either
+        an image, or a tuple (image, Overlay) to draw contours and points on top of the image."""
         self.box_widget.addItem(name)
         self.display_methods.append((func, kwargs))
 
     def draw(self):
         """Redraws the display image in the GUI."""
-        self.image_.set_data(self.display_image)
-        self.canvas.draw()
-        self.canvas.flush_events()
+        if self.display_image is not None:
+            self.image_widget.set_image(self.display_image, self.display_overlay)
+
+    def set_display(self, result):
+        """Sets the display image (and overlay) from the result of a display function."""
+        if isinstance(result, tuple):
+            self.display_image, self.display_overlay = result
+        else:
+            self.display_image, self.display_overlay = result, Overlay()
 
     @QtCore.pyqtSlot()
     def switch_video(self):
@@ -137,29 +149,53 @@ class VideoDisplayWidget(QtWidgets.QWidget):
     def change_display_image(self, i):
         """Changes the image to be displayed (e.g. contours, tracking etc.)."""
         self.display_function, self.display_kwargs = self.display_methods[i]
-        self.update_display_image()
-        self.draw()
+        self.request_display_image()
 
     @QtCore.pyqtSlot(int)
     def change_frame(self, frame):
         """Called when the frame changes."""
         self.frame_number = frame
-        self.update_display_image()
-        self.draw()
+        self.request_display_image()
 
     @staticmethod
     def input_image(image, **kwargs):
         return image
 
-    def update_display_image(self):
+    def render_image(self, video, frame_number, display_function, display_kwargs):
+        """Grabs and processes a frame. Returns None if the frame could not be read."""
         with warnings.catch_warnings(record=True) as w:  # catch frame warnings so that GUI does not crash
             warnings.simplefilter("always")
-            image = self.current_video.grab_frame(self.frame_number)  # grab the current frame
+            image = video.grab_frame(frame_number)  # grab the current frame
             w = list(filter(lambda i: issubclass(i.category, FrameErrorWarning), w))
             if len(w):
-                self.app.statusBar().showMessage(str(w[0].message), 1000)  # show any warning in the status bar
+                self.status_message.emit(str(w[0].message), 1000)  # show any warning in the status bar
             else:
-                self.display_image = self.display_function(image, **self.display_kwargs)
+                return display_function(image, **display_kwargs)
+
+    def render_kwargs(self) -> dict:
+        """Keyword arguments passed to the display function. Subclasses add a snapshot of any settings the display
+        function needs, so that the renderer thread never reads state that the GUI thread is changing."""
+        return dict(self.display_kwargs)
+
+    def update_display_image(self):
+        """Updates the display image in the GUI thread (see request_display_image)."""
+        result = self.render_image(self.current_video, self.frame_number, self.display_function, self.render_kwargs())
+        if result is not None:
+            self.set_display(result)
+
+    def request_display_image(self):
+        """Requests a new display image from the renderer thread. The display is redrawn when the image arrives, as
+        long as it is newer than the image that is shown, so the display keeps updating while requests keep
+        arriving (e.g. while a slider is dragged)."""
+        self.renderer.request(self.current_video, self.frame_number, self.display_function, self.render_kwargs())
+
+    @QtCore.pyqtSlot(int, object)
+    def rendered(self, request_id, result):
+        """Called when the renderer thread has finished rendering an image."""
+        if request_id > self.shown_request:
+            self.shown_request = request_id
+            self.set_display(result)
+            self.draw()
 
 
 class CheckableVideoWidget(VideoDisplayWidget):
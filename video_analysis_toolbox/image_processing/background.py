@@ -0,0 +1,163 @@
+from .contours import ContourDetector
+from ..utilities.profiling import profiler
+from ..utilities.sidecar import sidecar_path, load_sidecar, save_sidecar
+from pathlib import Path
+import cv2
+import numpy as np
+
+
+class BackgroundModel:
+    """Static background of a video, estimated as the median of a sample of frames.
+
+    Parameters
+    ----------
+    background : np.ndarray
+        Unsigned 8-bit integer background image.
+    polarity : str {'both', 'dark', 'bright'} (default = 'both')
+        Whether objects are darker ('dark') or brighter ('bright') than the background, or may be either ('both').
+    """
+
+    suffix = '.background.npz'
+
+    def __init__(self, background: np.ndarray, polarity='both'):
+        if polarity not in ('both', 'dark', 'bright'):
+            raise ValueError(f"Polarity must be 'both', 'dark' or 'bright', not {polarity}.")
+        self.background = np.ascontiguousarray(background, dtype='uint8')
+        self.polarity = polarity
+
+    @classmethod
+    def from_video(cls, video, n_samples=100, chunk_size=50, polarity='both'):
+        """Estimates the background of a video.
+
+        Frames are sampled evenly throughout the video and decoded chunk_size at a time. The median of each chunk is
+        computed, and the background is the median of these medians (exact if n_samples <= chunk_size). At most one
+        chunk of frames is held in memory.
+
+        Parameters
+        ----------
+        video : Video
+            An open video.
+        n_samples : int (default = 100)
+            Number of frames sampled from the video.
+        chunk_size : int (default = 50)
+            Number of frames decoded at a time.
+        polarity : str {'both', 'dark', 'bright'} (default = 'both')
+            See BackgroundModel.
+        """
+        samples = np.unique(np.linspace(0, video.frame_count - 1, n_samples).astype('int64'))
+        buffer = None
+        medians = []
+        for start in range(0, len(samples), chunk_size):
+            chunk = samples[start:start + chunk_size]
+            for i, f in enumerate(chunk):
+                frame = video.grab_frame(f)
+                if buffer is None:
+                    buffer = np.empty((min(chunk_size, len(samples)),) + frame.shape, dtype='uint8')
+                buffer[i] = frame
+            medians.append(np.median(buffer[:len(chunk)], axis=0))
+        background = np.median(np.array(medians), axis=0)
+        return cls(np.round(background).astype('uint8'), polarity)
+
+    @staticmethod
+    def sidecar(path) -> Path:
+        """Returns the path of the file where the background of a video is cached."""
+        return sidecar_path(path, BackgroundModel.suffix)
+
+    @classmethod
+    def load(cls, path, polarity='both'):
+        """Loads the cached background of a video. Returns None if there is no cache or it is out of date."""
+        data = load_sidecar(path, cls.suffix, 'background')
+        return None if data is None else cls(data[0], polarity)
+
+    def save(self, path):
+        """Caches the background of a video in a file next to the video."""
+        save_sidecar(path, self.suffix, background=self.background)
+
+    @classmethod
+    def open(cls, video, n_samples=100, chunk_size=50, polarity='both'):
+        """Returns the background of a video, loading it from the cache if possible. Otherwise the background is
+        estimated (see from_video) and cached for videos that are opened from a file."""
+        path = getattr(video, 'path', None)
+        if path is not None:
+            model = cls.load(path, polarity)
+            if model is not None:
+                return model
+        model = cls.from_video(video, n_samples, chunk_size, polarity)
+        if path is not None:
+            try:
+                model.save(path)
+            except OSError:  # read-only location
+                pass
+        return model
+
+    @profiler('background.subtract')
+    def subtract(self, image: np.ndarray, out=None, offset=(0, 0)) -> np.ndarray:
+        """Subtracts the background from an image or a stack of images.
+
+        Parameters
+        ----------
+        image : np.ndarray
+            Unsigned 8-bit integer image, or a stack of images with shape (n_frames, height, width).
+        out : np.ndarray (optional)
+            Output array (may be image itself to subtract in place).
+        offset : tuple (x, y) (default = (0, 0))
+            Position of the top left corner of the image within the frame, for images that are cropped from a frame
+            (the matching region of the background is subtracted).
+
+        Returns
+        -------
+        np.ndarray
+            Difference from the background (saturated at 0 for 'dark' and 'bright' polarity). Objects are always
+            brighter than the background in the output.
+        """
+        image = np.asarray(image)
+        x, y = int(offset[0]), int(offset[1])
+        h, w = image.shape[-2:]
+        background = self.background[y:y + h, x:x + w]
+        if (x < 0) or (y < 0) or (background.shape != (h, w)):
+            raise ValueError(f'Image of size {w}x{h} at offset ({x}, {y}) does not lie within the background of size '
+                             f'{self.background.shape[1]}x{self.background.shape[0]}.')
+        if out is None:
+            out = np.empty(image.shape, dtype='uint8')
+        if image.ndim == 2:
+            if self.polarity == 'both':
+                return cv2.absdiff(image, background, dst=out)
+            elif self.polarity == 'dark':
+                return cv2.subtract(background, image, dst=out)
+            return cv2.subtract(image, background, dst=out)
+        for frame, frame_out in zip(image, out):
+            self.subtract(frame, frame_out, offset)
+        return out
+
+
+class BackgroundContourDetector(ContourDetector):
+    """Extracting contours from images after subtracting a background.
+
+    Parameters
+    ----------
+    background : BackgroundModel
+        Background of the video.
+    threshold : int
+        Threshold applied to background-subtracted images to find contours.
+    n : int (default = -1)
+        Number of contours to be extracted (-1 for all contours identified with a given threshold).
+    levels : int (default = 0)
+        Number of pyramid levels for coarse-to-fine detection (see ContourDetector).
+    """
+
+    def __init__(self, background: BackgroundModel, threshold: int, n=-1, levels=0):
+        super().__init__(threshold, n, invert=False, levels=levels)
+        self.background = background
+        self._buffer = None
+
+    def preprocess(self, frames, offset=(0, 0)) -> np.ndarray:
+        """Subtracts the background into a buffer that is reused between calls. The buffer holds full frames, and
+        images that are cropped from a frame (e.g. by ROITracker) are subtracted into its top left corner, so it is
+        only reallocated when a larger stack of frames is passed."""
+        frames = np.asarray(frames)
+        n = frames.shape[0] if frames.ndim == 3 else 1
+        if (self._buffer is None) or (len(self._buffer) < n):
+            self._buffer = np.empty((n,) + self.background.background.shape, dtype='uint8')
+        h, w = frames.shape[-2:]
+        out = self._buffer[:n, :h, :w] if frames.ndim == 3 else self._buffer[0, :h, :w]
+        return self.background.subtract(frames, out=out, offset=offset)
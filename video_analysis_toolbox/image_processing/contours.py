@@ -1,8 +1,44 @@
-from ..utilities.data_structures import feature_vector
+from ..utilities.data_structures import feature_vector, feature_dtype
+from ..utilities.profiling import profiler
+from .cropping import crop
 import cv2
 import numpy as np
+import time
 
 
+@profiler('contours.search')
+def _find_contours(threshed):
+    """Finds external contours in a binary image (compatible with OpenCV 3 and 4+)."""
+    try:
+        img, contours, hierarchy = cv2.findContours(threshed, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    except ValueError:
+        contours, hierarchy = cv2.findContours(threshed, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    return contours
+
+
+@profiler('contours.sort')
+def _largest_contours(contours, n=-1):
+    """Selects the n largest contours, computing the area of each contour only once.
+
+    Returns
+    -------
+    contours : list
+        The n largest contours sorted by area (largest first).
+    areas : np.ndarray
+        Area of each returned contour.
+    """
+    areas = np.array([cv2.contourArea(contour) for contour in contours], dtype='float64')
+    if n == 0:
+        idxs = np.zeros(0, dtype='int64')
+    elif -1 < n < len(contours):
+        idxs = np.argpartition(-areas, n - 1)[:n]
+        idxs = idxs[np.argsort(-areas[idxs], kind='stable')]
+    else:
+        idxs = np.argsort(-areas, kind='stable')
+    return [contours[i] for i in idxs], areas[idxs]
+
+
+@profiler('contours.find_contours')
 def find_contours(image, threshold, n=-1, invert=False):
     """Finds all the contours in an image after binarizing with the threshold.
 
@@ -24,23 +60,136 @@ def find_contours(image, threshold, n=-1, invert=False):
         after applying the threshold.
     """
     # apply threshold
-    if invert:
-        ret, threshed = cv2.threshold(image, threshold, 255, cv2.THRESH_BINARY_INV)
-    else:
-        ret, threshed = cv2.threshold(image, threshold, 255, cv2.THRESH_BINARY)
+    with profiler.stage('contours.threshold'):
+        if invert:
+            ret, threshed = cv2.threshold(image, threshold, 255, cv2.THRESH_BINARY_INV)
+        else:
+            ret, threshed = cv2.threshold(image, threshold, 255, cv2.THRESH_BINARY)
     # find contours
-    try:
-        img, contours, hierarchy = cv2.findContours(threshed, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-    except ValueError:
-        contours, hierarchy = cv2.findContours(threshed, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    contours = _find_contours(threshed)
     # sort in descending size order
-    contours = sorted(contours, key=lambda contour: cv2.contourArea(contour), reverse=True)
-    if n > -1:
-        return contours[:n]
-    else:
-        return contours
+    contours, areas = _largest_contours(contours, n)
+    return contours
+
 
+@profiler('contours.find_contours_pyramid')
+def find_contours_pyramid(image, threshold, n=-1, invert=False, levels=1, pad=(2, 2), fallback=True):
+    """Finds contours coarse-to-fine. Contours are first found in a downsampled image (cv2.pyrDown applied levels
+    times), then each one is found again at full resolution within a crop around its bounding box, so that the full
+    resolution image is only thresholded and searched near the objects.
 
+    Objects that are too small or thin to survive downsampling are not found. Objects that merge in the downsampled
+    image (e.g. separated by a gap of a few pixels) are found separately, since every contour within a crop is kept.
+    Crops that overlap are merged and searched once, so that no object is found twice.
+
+    Parameters
+    ----------
+    image : array like
+        Unsigned 8-bit integer array.
+    threshold : int
+        Threshold applied to images to find contours.
+    n : int (default = -1)
+        Number of contours to be extracted (-1 for all contours identified with a given threshold).
+    invert : bool (default = False)
+        Whether to invert the binarization.
+    levels : int (default = 1)
+        Number of times the image is downsampled (by a factor of 2 each time).
+    pad : tuple (x_pad, y_pad) (default = (2, 2))
+        Number of full resolution pixels added around the bounding box of each coarse contour (in addition to the size
+        of a downsampled pixel).
+    fallback : bool (default = True)
+        Whether to search the full resolution image if nothing is found in the downsampled image.
+
+    Returns
+    -------
+    contours : list
+        Full resolution contours sorted by contour area (largest first).
+    """
+    small = image
+    for i in range(levels):
+        small = cv2.pyrDown(small)
+    coarse = find_contours(small, threshold, n, invert)
+    if len(coarse) == 0:
+        return find_contours(image, threshold, n, invert) if fallback else []
+    scale = 2 ** levels
+    pad = np.asarray(pad) + scale
+    boxes = []
+    for contour in coarse:
+        points = contour.reshape(-1, 2) * scale
+        p1 = np.clip(points.min(axis=0) - pad, 0, (image.shape[1] - 1, image.shape[0] - 1))
+        p2 = np.clip(points.max(axis=0) + pad, 0, (image.shape[1] - 1, image.shape[0] - 1))
+        boxes.append(np.concatenate([p1, p2]))
+    contours = []
+    for x0, y0, x1, y1 in _merge_boxes(boxes):
+        for refined in find_contours(crop(image, (x0, y0), (x1, y1)), threshold, -1, invert):
+            contours.append(refined + np.array([x0, y0], dtype=refined.dtype))
+    contours, areas = _largest_contours(contours, n)
+    return contours
+
+
+def _merge_boxes(boxes):
+    """Merges overlapping (or touching) boxes (x0, y0, x1, y1), with inclusive corners, until no two boxes overlap."""
+    boxes = [np.asarray(box) for box in boxes]
+    merged = True
+    while merged:
+        merged = False
+        for i in range(len(boxes)):
+            for j in range(i + 1, len(boxes)):
+                a, b = boxes[i], boxes[j]
+                if (a[0] <= b[2] + 1) and (b[0] <= a[2] + 1) and (a[1] <= b[3] + 1) and (b[1] <= a[3] + 1):
+                    boxes[i] = np.concatenate([np.minimum(a[:2], b[:2]), np.maximum(a[2:], b[2:])])
+                    del boxes[j]
+                    merged = True
+                    break
+            if merged:
+                break
+    return boxes
+
+
+@profiler('contours.find_contours_batch')
+def find_contours_batch(frames, threshold, n=-1, invert=False, return_areas=False):
+    """Finds the contours in a stack of images. The whole stack is binarized in a single vectorized operation and
+    the area of each contour is only computed once.
+
+    Parameters
+    ----------
+    frames : array like
+        Unsigned 8-bit integer array with shape (n_frames, height, width).
+    threshold : int
+        Threshold applied to images to find contours.
+    n : int (default = -1)
+        Number of contours to be extracted from each frame (-1 for all contours identified with a given threshold).
+    invert : bool (default = False)
+        Whether to invert the binarization.
+    return_areas : bool (default = False)
+        Whether to also return the areas of the contours.
+
+    Returns
+    -------
+    contours : list
+        A list containing, for each frame, a list of contours sorted by contour area (largest first).
+    areas : list
+        Only returned if return_areas is True. A list containing, for each frame, an array of contour areas.
+    """
+    frames = np.asarray(frames)
+    # apply threshold (same as cv2.THRESH_BINARY / cv2.THRESH_BINARY_INV, with a foreground value of 1)
+    with profiler.stage('contours.threshold'):
+        if invert:
+            threshed = np.less_equal(frames, threshold)
+        else:
+            threshed = np.greater(frames, threshold)
+        threshed = threshed.view(np.uint8)
+    contours, areas = [], []
+    for image in threshed:
+        frame_contours, frame_areas = _largest_contours(_find_contours(image), n)
+        contours.append(frame_contours)
+        areas.append(frame_areas)
+    if return_areas:
+        return contours, areas
+    return contours
+
+
+@profiler('contours.contour_info')
 def contour_info(contour):
     """Uses image moments to find the centre and orientation of a contour
 
@@ -65,6 +214,117 @@ def contour_info(contour):
     return feature_vector(x=c[0], y=c[1], angle=theta)
 
 
+def _feature_array(n, out=None):
+    """Returns a structured array for storing the features of n objects (checks the size of out if given)."""
+    if out is None:
+        return np.empty(n, dtype=feature_dtype)
+    if len(out) != n:
+        raise ValueError(f'Output array has space for {len(out)} objects but {n} were given.')
+    return out
+
+
+def _fill_features(out, m00, m10, m01, mu20, mu11, mu02):
+    """Computes centre of mass and orientation from image moments (m00 must be non-zero)."""
+    out['x'] = m10 / m00
+    out['y'] = m01 / m00
+    out['angle'] = 0.5 * np.arctan2(2 * mu11 + 0., mu20 - mu02)  # + 0. so that -0. gives pi / 2 rather than -pi / 2
+
+
+@profiler('contours.contour_info_batch')
+def contour_info_batch(contours, out=None):
+    """Finds the centre and orientation of many contours at once. Equivalent to calling contour_info on each contour,
+    but the moments of all contours are computed together in a single vectorized pass.
+
+    Parameters
+    ----------
+    contours : list
+        List of contours, each represented as an array.
+    out : np.ndarray (optional)
+        Preallocated structured array (dtype = feature_dtype) with one element per contour.
+
+    Returns
+    -------
+    features : np.ndarray (dtype = feature_dtype)
+        Structured array with fields x, y and angle for each contour. Contours with zero area are given the mean
+        position of their points and an angle of zero.
+    """
+    out = _feature_array(len(contours), out)
+    if len(contours) == 0:
+        return out
+    contours = [np.reshape(contour, (-1, 2)) for contour in contours]
+    points = np.concatenate(contours).astype('float64')
+    lengths = np.array([len(contour) for contour in contours])
+    starts = np.cumsum(lengths) - lengths
+    # index of the next vertex of each polygon (wrapping around at the end of each contour)
+    following = np.arange(1, len(points) + 1)
+    following[starts + lengths - 1] = starts
+    x, y = points[:, 0], points[:, 1]
+    xn, yn = x[following], y[following]
+    # polygon moments from Green's theorem (same as cv2.moments for a contour)
+    a = x * yn - xn * y
+    m00 = np.add.reduceat(a, starts) / 2
+    m10 = np.add.reduceat(a * (x + xn), starts) / 6
+    m01 = np.add.reduceat(a * (y + yn), starts) / 6
+    m20 = np.add.reduceat(a * (x * x + x * xn + xn * xn), starts) / 12
+    m02 = np.add.reduceat(a * (y * y + y * yn + yn * yn), starts) / 12
+    m11 = np.add.reduceat(a * (2 * x * y + x * yn + xn * y + 2 * xn * yn), starts) / 24
+    # zero area contours: mean of the contour points, zero orientation
+    empty = (m00 == 0)
+    m00[empty] = 1
+    sums = np.add.reduceat(points, starts, axis=0)
+    m10[empty] = sums[empty, 0] / lengths[empty]
+    m01[empty] = sums[empty, 1] / lengths[empty]
+    m20[empty] = m02[empty] = m11[empty] = 0
+    mu20 = m20 - m10 * m10 / m00
+    mu02 = m02 - m01 * m01 / m00
+    mu11 = m11 - m10 * m01 / m00
+    mu20[empty] = mu02[empty] = mu11[empty] = 0
+    # orientation of the contour does not depend on the direction in which the polygon is traversed
+    sign = np.where(m00 < 0, -1, 1)
+    _fill_features(out, m00, m10, m01, mu20 * sign, mu11 * sign, mu02 * sign)
+    return out
+
+
+@profiler('contours.label_info')
+def label_info(labels, n=None, out=None):
+    """Finds the centre and orientation of every labelled object in a label image (e.g. from
+    cv2.connectedComponents) using pixel moments.
+
+    Parameters
+    ----------
+    labels : np.ndarray
+        Integer array in which each object is marked with a label from 1 to n (0 is background).
+    n : int (optional)
+        Number of labels (defaults to the largest label in the image).
+    out : np.ndarray (optional)
+        Preallocated structured array (dtype = feature_dtype) with one element per label.
+
+    Returns
+    -------
+    features : np.ndarray (dtype = feature_dtype)
+        Structured array with fields x, y and angle for labels 1 to n. Labels not present in the image are NaN.
+    """
+    labels = np.asarray(labels)
+    if n is None:
+        n = int(labels.max()) if labels.size else 0
+    out = _feature_array(n, out)
+    y, x = np.indices(labels.shape, dtype='float64')
+    labels, x, y = labels.ravel(), x.ravel(), y.ravel()
+    m00 = np.bincount(labels, minlength=n + 1)[1:n + 1].astype('float64')
+    m10 = np.bincount(labels, weights=x, minlength=n + 1)[1:n + 1]
+    m01 = np.bincount(labels, weights=y, minlength=n + 1)[1:n + 1]
+    m20 = np.bincount(labels, weights=x * x, minlength=n + 1)[1:n + 1]
+    m02 = np.bincount(labels, weights=y * y, minlength=n + 1)[1:n + 1]
+    m11 = np.bincount(labels, weights=x * y, minlength=n + 1)[1:n + 1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mu20 = m20 - m10 * m10 / m00
+        mu02 = m02 - m01 * m01 / m00
+        mu11 = m11 - m10 * m01 / m00
+        _fill_features(out, m00, m10, m01, mu20, mu11, mu02)
+    return out
+
+
+@profiler('contours.mask')
 def mask(image: np.ndarray, contours: list, equalize: bool = False) -> (np.ndarray, np.ndarray):
     """Masks an image using contours
 
@@ -87,13 +347,76 @@ def mask(image: np.ndarray, contours: list, equalize: bool = False) -> (np.ndarr
     mask = np.zeros(image.shape, np.uint8)
     masked = mask.copy()
     cv2.drawContours(mask, contours, -1, 1, -1)
-    mask = mask.astype(np.bool)
+    mask = mask.astype(bool)
     masked[mask] = image[mask]
     if equalize:
         masked = cv2.equalizeHist(masked)
     return mask, masked
 
 
+class Masker:
+    """Masks images using contours without allocating new arrays for every frame (see mask).
+
+    The mask and masked image are kept in buffers that are reused between calls, and only the bounding box of the
+    contours is drawn and copied. The arrays returned are views of these buffers, so they are overwritten by the next
+    call and must be copied if they need to be kept.
+    """
+
+    def __init__(self):
+        self._mask = None
+        self._masked = None
+        self._equalized = None
+        self._box = None
+
+    def _buffers(self, shape):
+        """(Re)allocates the buffers if the shape of the image changes."""
+        if (self._mask is None) or (self._mask.shape != shape):
+            self._mask = np.zeros(shape, np.uint8)
+            self._masked = np.zeros(shape, np.uint8)
+            self._equalized = np.zeros(shape, np.uint8)
+            self._box = None
+
+    @profiler('contours.mask')
+    def __call__(self, image: np.ndarray, contours: list, equalize: bool = False) -> (np.ndarray, np.ndarray):
+        """Masks an image using contours
+
+        Parameters
+        ----------
+        image : np.ndarray
+            Unsigned 8-bit integer array
+        contours : list
+            List of contours in the image to mask
+        equalize : bool (default = False)
+            Equalize the histogram of pixel values after applying mask
+
+        Returns
+        -------
+        mask : np.ndarray (dtype = bool)
+            Boolean array of pixels inside the contours
+        masked : np.ndarray (dtype = uint8)
+            Image after settings pixels outside the contours to zero
+        """
+        self._buffers(image.shape)
+        # clear the region drawn in the previous frame
+        if self._box is not None:
+            self._mask[self._box] = 0
+            self._masked[self._box] = 0
+            self._box = None
+        if len(contours):
+            x, y, w, h = cv2.boundingRect(np.concatenate([np.reshape(c, (-1, 2)) for c in contours]).astype(np.int32))
+            x0, y0 = max(x, 0), max(y, 0)
+            x1, y1 = min(x + w, image.shape[1]), min(y + h, image.shape[0])
+            if (x1 > x0) and (y1 > y0):
+                self._box = np.s_[y0:y1, x0:x1]
+                mask_roi = self._mask[self._box]
+                cv2.drawContours(mask_roi, contours, -1, 1, -1, offset=(-x0, -y0))
+                np.copyto(self._masked[self._box], image[self._box], where=mask_roi.view(bool))
+        mask = self._mask.view(bool)
+        if equalize:
+            return mask, cv2.equalizeHist(self._masked, dst=self._equalized)
+        return mask, self._masked
+
+
 class ContourDetector:
     """Extracting contours from images.
 
@@ -105,15 +428,98 @@ class ContourDetector:
         Number of contours to be extracted (-1 for all contours identified with a given threshold).
     invert : bool (default = False)
         Whether to invert the binarization.
+    levels : int (default = 0)
+        If greater than 0, contours are found coarse-to-fine in images downsampled this many times (see
+        find_contours_pyramid). Use pyramid_error to check the accuracy against full resolution detection.
+    pad : tuple (x_pad, y_pad) (default = (2, 2))
+        Padding of the full resolution crops used for coarse-to-fine detection.
     """
 
-    def __init__(self, threshold: int, n=-1, invert=False):
+    def __init__(self, threshold: int, n=-1, invert=False, levels=0, pad=(2, 2)):
         self.threshold = threshold
         self.n = n
         self.invert = invert
+        self.levels = levels
+        self.pad = pad
 
-    def find_contours(self, image):
+    def preprocess(self, frames, offset=(0, 0)) -> np.ndarray:
+        """Prepares an image or a stack of images for thresholding (nothing by default). Subclasses override this,
+        e.g. to subtract a background. The offset (x, y) is the position of images that are cropped from a frame."""
+        return frames
+
+    def find_contours(self, image, offset=(0, 0)):
+        """Finds contours in an image. The offset (x, y) of an image that is cropped from a frame is passed on to
+        preprocess."""
+        image = self.preprocess(image, offset)
+        if self.levels > 0:
+            return find_contours_pyramid(image, self.threshold, self.n, self.invert, self.levels, self.pad)
         return find_contours(image, self.threshold, self.n, self.invert)
 
+    def find_contours_batch(self, frames, return_areas=False):
+        frames = self.preprocess(frames)
+        if self.levels > 0:
+            contours = [find_contours_pyramid(frame, self.threshold, self.n, self.invert, self.levels, self.pad)
+                        for frame in frames]
+            if return_areas:
+                areas = [np.array([cv2.contourArea(c) for c in frame_contours], dtype='float64')
+                         for frame_contours in contours]
+                return contours, areas
+            return contours
+        return find_contours_batch(frames, self.threshold, self.n, self.invert, return_areas)
+
+    def pyramid_error(self, frames, levels=None) -> dict:
+        """Compares coarse-to-fine detection with full resolution detection.
+
+        Parameters
+        ----------
+        frames : iterable
+            Sample frames.
+        levels : int (optional)
+            Number of pyramid levels to test (defaults to the levels of the detector, or 1 if that is 0).
+
+        Returns
+        -------
+        dict
+            Mean and maximum difference in position (pixels) and orientation (radians) between each contour found at
+            full resolution and the nearest contour found coarse-to-fine, the number of frames in which a different
+            number of contours was found, and the mean time per frame of each method (seconds). Both methods are
+            applied to the preprocessed frames (see preprocess).
+        """
+        levels = (self.levels or 1) if levels is None else levels
+        position, angle, mismatched = [], [], 0
+        full_time, pyramid_time = 0., 0.
+        n_frames = 0
+        for frame in frames:
+            frame = self.preprocess(frame)
+            t0 = time.perf_counter()
+            full = find_contours(frame, self.threshold, self.n, self.invert)
+            t1 = time.perf_counter()
+            coarse = find_contours_pyramid(frame, self.threshold, self.n, self.invert, levels, self.pad)
+            t2 = time.perf_counter()
+            full_time += t1 - t0
+            pyramid_time += t2 - t1
+            n_frames += 1
+            mismatched += len(full) != len(coarse)
+            if len(full) and len(coarse):
+                a, b = contour_info_batch(full), contour_info_batch(coarse)
+                distances = np.hypot(a['x'][:, None] - b['x'][None], a['y'][:, None] - b['y'][None])
+                b = b[np.argmin(distances, axis=1)]
+                position.append(np.hypot(a['x'] - b['x'], a['y'] - b['y']))
+                angle.append(np.abs((b['angle'] - a['angle'] + np.pi / 2) % np.pi - np.pi / 2))
+        position = np.concatenate(position) if position else np.zeros(0)
+        angle = np.concatenate(angle) if angle else np.zeros(0)
+        summarize = (lambda x, f: float(f(x)) if len(x) else np.nan)
+        return dict(levels=levels,
+                    position_error_mean=summarize(position, np.mean),
+                    position_error_max=summarize(position, np.max),
+                    angle_error_mean=summarize(angle, np.mean),
+                    angle_error_max=summarize(angle, np.max),
+                    mismatched_frames=mismatched,
+                    full_time=full_time / max(n_frames, 1),
+                    pyramid_time=pyramid_time / max(n_frames, 1),
+                    speedup=full_time / pyramid_time if pyramid_time > 0 else np.nan)
+
     contour_info = staticmethod(contour_info)
+    contour_info_batch = staticmethod(contour_info_batch)
+    label_info = staticmethod(label_info)
     mask = staticmethod(mask)
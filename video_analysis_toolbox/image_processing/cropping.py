@@ -1,7 +1,12 @@
+from ..utilities.data_structures import feature_dtype
+from ..utilities.profiling import profiler
+import cv2
 import numpy as np
+from pathlib import Path
 
 
-def crop(image: np.ndarray, p1: {tuple, np.ndarray}, p2: {tuple, np.ndarray}):
+@profiler('cropping.crop')
+def crop(image: np.ndarray, p1: {tuple, np.ndarray}, p2: {tuple, np.ndarray}, fill=None):
     """Crops an image to a rectangle defined by corner points p1 and p2
 
     Parameters
@@ -12,19 +17,41 @@ def crop(image: np.ndarray, p1: {tuple, np.ndarray}, p2: {tuple, np.ndarray}):
         (x, y) coordinates of one corner of the cropping box
     p2 : {tuple, np.ndarray}
         (x, y) coordinates of the opposite corner of the cropping box
+    fill : int (optional)
+        Value of pixels of the box that are outside the image. If None, the box must be inside the image.
 
     Returns
     -------
     cropped : np.ndarray
-        Cropped image
+        Cropped image (a view of the image if the box is inside the image)
+
+    Raises
+    ------
+    ValueError
+        If the box is not inside the image and no fill value is given.
     """
-    xmin, ymin = min(p1[0], p2[0]), min(p1[1], p2[1])
-    xmax, ymax = max(p1[0], p2[0]), max(p1[1], p2[1])
-    assert (xmin >= 0) and (ymin >= 0) and (xmax < image.shape[1]) and (ymax < image.shape[0])
-    cropped = image[ymin:ymax + 1, xmin:xmax + 1]
+    xmin, ymin = int(min(p1[0], p2[0])), int(min(p1[1], p2[1]))
+    xmax, ymax = int(max(p1[0], p2[0])), int(max(p1[1], p2[1]))
+    if (xmin >= 0) and (ymin >= 0) and (xmax < image.shape[1]) and (ymax < image.shape[0]):
+        return image[ymin:ymax + 1, xmin:xmax + 1]
+    if fill is None:
+        raise ValueError(f'Box ({xmin}, {ymin}), ({xmax}, {ymax}) is outside the image (height, width = '
+                         f'{image.shape[:2]}).')
+    cropped = np.full((ymax - ymin + 1, xmax - xmin + 1) + image.shape[2:], fill, dtype=image.dtype)
+    _paste(image, xmin, ymin, cropped)
     return cropped
 
 
+def _paste(image, x0, y0, out):
+    """Copies the part of an image that overlaps a box with top left corner (x0, y0) and the size of out into out."""
+    h, w = out.shape[:2]
+    x1, y1 = max(x0, 0), max(y0, 0)
+    x2, y2 = min(x0 + w, image.shape[1]), min(y0 + h, image.shape[0])
+    if (x2 > x1) and (y2 > y1):
+        out[y1 - y0:y2 - y0, x1 - x0:x2 - x0] = image[y1:y2, x1:x2]
+
+
+@profiler('cropping.crop_to_contour')
 def crop_to_contour(image: np.ndarray, contour: np.ndarray, pad=(0, 0)):
     """Crops an image to the bounding box of a contour
 
@@ -44,6 +71,149 @@ def crop_to_contour(image: np.ndarray, contour: np.ndarray, pad=(0, 0)):
     return cropped, p1, p2
 
 
+@profiler('cropping.crop_centred')
+def crop_centred(image: np.ndarray, centre, size, angle=None, out=None, fill=0):
+    """Crops a fixed-size box centred on a point, optionally rotated so that an angle lies along the x axis
+
+    Parameters
+    ----------
+    image : np.ndarray
+        Image to be cropped
+    centre : tuple (x, y)
+        Centre of the box
+    size : tuple (width, height)
+        Size of the box
+    angle : float (optional)
+        Orientation (in radians, as returned by contour_info). If given, the crop is rotated so that this direction
+        points along the positive x axis of the crop (with bilinear interpolation).
+    out : np.ndarray (optional)
+        Array with shape (height, width) where the crop is written
+    fill : int (default = 0)
+        Value of pixels of the box that are outside the image (or everywhere if the centre is NaN)
+
+    Returns
+    -------
+    cropped : np.ndarray
+        Cropped image (always a copy)
+    """
+    w, h = size
+    if out is None:
+        out = np.empty((h, w) + image.shape[2:], dtype=image.dtype)
+    x, y = centre
+    if np.isnan(x) or np.isnan(y):
+        out[:] = fill
+    elif (angle is None) or np.isnan(angle):
+        x0, y0 = int(round(x - (w - 1) / 2.)), int(round(y - (h - 1) / 2.))
+        if (x0 < 0) or (y0 < 0) or (x0 + w > image.shape[1]) or (y0 + h > image.shape[0]):
+            out[:] = fill
+        _paste(image, x0, y0, out)
+    else:
+        # maps crop coordinates to image coordinates
+        c, s = np.cos(angle), np.sin(angle)
+        u, v = (w - 1) / 2., (h - 1) / 2.
+        M = np.array([[c, -s, x - c * u + s * v], [s, c, y - s * u - c * v]])
+        cv2.warpAffine(image, M, (w, h), dst=out, flags=cv2.INTER_LINEAR | cv2.WARP_INVERSE_MAP,
+                       borderMode=cv2.BORDER_CONSTANT, borderValue=fill)
+    return out
+
+
+@profiler('cropping.crop_batch')
+def crop_batch(frames, features, size, rotate=False, out=None, fill=0):
+    """Crops a fixed-size box centred on an object in each of a stack of frames
+
+    Parameters
+    ----------
+    frames : array like
+        Stack of images with shape (n_frames, height, width)
+    features : np.ndarray
+        Features of the object in each frame (dtype = feature_dtype, shape (n_frames,)). Frames where the object is NaN
+        are filled with the fill value.
+    size : tuple (width, height)
+        Size of the crops
+    rotate : bool (default = False)
+        Whether to rotate each crop by the angle of the object (see crop_centred)
+    out : np.ndarray (optional)
+        Array with shape (n_frames, height, width) where the crops are written (e.g. a memory-mapped array)
+    fill : int (default = 0)
+        Value of pixels outside the image
+
+    Returns
+    -------
+    crops : np.ndarray
+        Array of crops with shape (n_frames, height, width)
+    """
+    w, h = size
+    if out is None:
+        out = np.empty((len(frames), h, w) + np.shape(frames)[3:], dtype='uint8')
+    elif len(out) != len(frames):
+        raise ValueError(f'Output array has space for {len(out)} crops but {len(frames)} frames were given.')
+    for image, feature, cropped in zip(frames, features, out):
+        crop_centred(image, (feature['x'], feature['y']), size, feature['angle'] if rotate else None, cropped, fill)
+    return out
+
+
+class BatchCropper:
+    """Extracts fixed-size crops centred on a tracked object from every frame of a video
+
+    Parameters
+    ----------
+    size : tuple (width, height)
+        Size of the crops
+    rotate : bool (default = False)
+        Whether to rotate each crop by the angle of the object (see crop_centred)
+    fill : int (default = 0)
+        Value of pixels outside the image
+    """
+
+    def __init__(self, size, rotate=False, fill=0):
+        self.size = tuple(size)
+        self.rotate = rotate
+        self.fill = fill
+
+    def __call__(self, frames, features, out=None):
+        return crop_batch(frames, features, self.size, self.rotate, out, self.fill)
+
+    def crop_video(self, video, features, path=None, first_frame=0, chunk_size=1000, out=None):
+        """Crops a range of frames of a video, decoding the frames in chunks
+
+        Parameters
+        ----------
+        video : Video
+            An open video
+        features : np.ndarray
+            Features of the object in each frame of the range (dtype = feature_dtype, shape (n_frames,))
+        path : str or Path (optional)
+            If given, crops are written to a .npy file at this path (memory-mapped, so that the crops are never all
+            held in memory)
+        first_frame : int (default = 0)
+            First frame of the range (features[0] is the object in this frame)
+        chunk_size : int (default = 1000)
+            Number of frames decoded at a time
+        out : np.ndarray (optional)
+            Preallocated array with shape (n_frames, height, width) (ignored if path is given)
+
+        Returns
+        -------
+        crops : np.ndarray
+            Array of crops with shape (n_frames, height, width) (memory-mapped if path is given)
+        """
+        features = np.asarray(features, dtype=feature_dtype).reshape(-1)
+        n = len(features)
+        w, h = self.size
+        if path is not None:
+            out = np.lib.format.open_memmap(Path(path), mode='w+', dtype='uint8', shape=(n, h, w))
+        elif out is None:
+            out = np.empty((n, h, w), dtype='uint8')
+        elif len(out) != n:
+            raise ValueError(f'Output array has space for {len(out)} crops but {n} frames were requested.')
+        for start, stop, frames in video.iter_chunks(first_frame, first_frame + n, chunk_size):
+            i, j = start - first_frame, stop - first_frame
+            self(frames, features[i:j], out[i:j])
+        if path is not None:
+            out.flush()
+        return out
+
+
 class Cropper:
     """Object-oriented image cropping (useful for subclassing)"""
 
@@ -52,3 +222,5 @@ class Cropper:
 
     crop = staticmethod(crop)
     crop_to_contour = staticmethod(crop_to_contour)
+    crop_centred = staticmethod(crop_centred)
+    crop_batch = staticmethod(crop_batch)
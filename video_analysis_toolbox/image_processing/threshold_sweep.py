@@ -0,0 +1,118 @@
+from ..utilities.data_structures import TrackingError
+import copy
+import numpy as np
+
+
+class ThresholdGrid:
+    """Applies a tracker to an image with every pair of thresholds on a grid.
+
+    Each pair (thresh1, thresh2) with thresh2 < thresh1 (the order kept by DoubleThresholdWidget) is applied to a
+    shallow copy of the tracker, so the tracker itself is never modified and the results are exactly those the tracker
+    gives with the same thresholds.
+
+    Parameters
+    ----------
+    tracker : Tracker
+        Tracker with thresh1 and thresh2 attributes and an apply_thresholds(image) method that returns the frame_info
+        passed to show_contours / show_tracking (or raises TrackingError).
+    step : int (default = 8)
+        Spacing of the thresholds on the grid.
+    """
+
+    def __init__(self, tracker, step=8):
+        self.tracker = tracker
+        self.step = step
+        self.thresholds = np.arange(0, 256, step)
+        self.pairs = [(int(t1), int(t2)) for t1 in self.thresholds for t2 in self.thresholds if t2 < t1]
+
+    def snap(self, threshold) -> int:
+        """Returns the threshold on the grid that is nearest to a threshold."""
+        return int(self.thresholds[np.argmin(np.abs(self.thresholds - threshold))])
+
+    def apply(self, image, thresh1, thresh2):
+        """Returns the frame_info of the tracker for an image with a pair of thresholds (the TrackingError if it
+        raises one)."""
+        tracker = copy.copy(self.tracker)
+        tracker.thresh1, tracker.thresh2 = thresh1, thresh2
+        try:
+            return tracker.apply_thresholds(image)
+        except TrackingError as e:
+            return e
+
+    def compute(self, image, cancel=None):
+        """Applies every pair of thresholds on the grid to an image.
+
+        Parameters
+        ----------
+        image : np.ndarray
+            Image passed to the tracker.
+        cancel : callable (optional)
+            Called between pairs of thresholds; the computation stops if it returns True.
+
+        Returns
+        -------
+        dict or None
+            frame_info (or TrackingError) for each pair (thresh1, thresh2), or None if the computation was cancelled.
+        """
+        results = {}
+        for thresh1, thresh2 in self.pairs:
+            if (cancel is not None) and cancel():
+                return None
+            results[thresh1, thresh2] = self.apply(image, thresh1, thresh2)
+        return results
+
+
+class ThresholdSweep:
+    """Summarizes how well a tracker works with every pair of thresholds on a grid over a sample of frames from a
+    video, so that thresholds can be chosen without tracking every frame.
+
+    Parameters
+    ----------
+    video : Video
+        An open video.
+    grid : ThresholdGrid
+        Tracker and thresholds to test.
+    n_samples : int (default = 10)
+        Number of frames sampled evenly throughout the video.
+    cancel : callable (optional)
+        Called between pairs of thresholds; the sweep stops if it returns True.
+
+    Attributes
+    ----------
+    frames : np.ndarray
+        Frame numbers of the sampled frames.
+    tracked : np.ndarray
+        Whether the tracker succeeded (did not raise TrackingError) in each sampled frame with each pair of thresholds,
+        shape (n_frames, n_thresholds, n_thresholds) indexed by the positions of thresh1 and thresh2 on the grid.
+    complete : bool
+        False if the sweep was cancelled.
+    """
+
+    def __init__(self, video, grid: ThresholdGrid, n_samples=10, cancel=None):
+        self.grid = grid
+        self.frames = np.unique(np.linspace(0, video.frame_count - 1, n_samples).astype('int64'))
+        n = len(grid.thresholds)
+        self.tracked = np.zeros((len(self.frames), n, n), dtype=bool)
+        self.complete = False
+        for i, f in enumerate(self.frames):
+            results = grid.compute(video.grab_frame(f), cancel)
+            if results is None:
+                return
+            for (thresh1, thresh2), frame_info in results.items():
+                self.tracked[i, thresh1 // grid.step, thresh2 // grid.step] = not isinstance(frame_info, TrackingError)
+        self.complete = True
+
+    @property
+    def detection_rate(self) -> np.ndarray:
+        """Fraction of sampled frames in which the tracker succeeds with each pair of thresholds, shape
+        (n_thresholds, n_thresholds) (NaN for pairs that are not on the grid, i.e. thresh2 >= thresh1)."""
+        rate = self.tracked.mean(axis=0)
+        rate[np.triu_indices(len(self.grid.thresholds))] = np.nan
+        return rate
+
+    def summary(self, thresh1, thresh2) -> dict:
+        """Detection rate of the nearest pair of thresholds on the grid."""
+        thresh1, thresh2 = self.grid.snap(thresh1), self.grid.snap(thresh2)
+        return dict(thresh1=thresh1,
+                    thresh2=thresh2,
+                    detection_rate=float(self.detection_rate[thresh1 // self.grid.step, thresh2 // self.grid.step]))
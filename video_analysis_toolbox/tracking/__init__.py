@@ -0,0 +1,5 @@
+from .batch import BatchTracker
+from .roi import ROITracker
+from .results import ResultsStore
+from .multi import MultiObjectTracker
+from .sparse import SparseTracker
@@ -0,0 +1,234 @@
+import numpy as np
+
+
+def hungarian(cost):
+    """Solves the linear assignment problem (minimum total cost matching of rows to columns).
+
+    Shortest augmenting path implementation of the Hungarian algorithm, O(n^2 m) for an n x m matrix, with the inner
+    loop over columns vectorized. Infinite costs mark pairs that must not be matched.
+
+    Parameters
+    ----------
+    cost : array like
+        Cost matrix with shape (n_rows, n_cols).
+
+    Returns
+    -------
+    rows, cols : np.ndarray
+        Indices of matched rows and columns (sorted by row).
+    """
+    cost = np.asarray(cost, dtype='float64')
+    if cost.shape[0] > cost.shape[1]:
+        cols, rows = hungarian(cost.T)
+        order = np.argsort(rows)
+        return rows[order], cols[order]
+    n, m = cost.shape
+    finite = np.isfinite(cost)
+    if (n == 0) or not finite.any():
+        return np.zeros(0, dtype='int64'), np.zeros(0, dtype='int64')
+    # forbidden pairs are given a cost larger than any assignment of allowed pairs and removed afterwards
+    big = (np.abs(cost[finite]).max() + 1) * (n + 1)
+    c = np.where(finite, cost, big)
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    p = np.zeros(m + 1, dtype='int64')  # row matched to each column (1-based, 0 for unmatched)
+    way = np.zeros(m + 1, dtype='int64')
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            free = ~used[1:]
+            reduced = c[i0 - 1] - u[i0] - v[1:]
+            update = free & (reduced < minv[1:])
+            minv[1:][update] = reduced[update]
+            way[1:][update] = j0
+            candidates = np.where(free, minv[1:], np.inf)
+            j1 = int(np.argmin(candidates)) + 1
+            delta = candidates[j1 - 1]
+            u[p[used]] += delta
+            v[used] -= delta
+            minv[1:][free] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+    cols = np.nonzero(p[1:])[0]
+    rows = p[1:][cols] - 1
+    keep = finite[rows, cols]
+    rows, cols = rows[keep], cols[keep]
+    order = np.argsort(rows)
+    return rows[order], cols[order]
+
+
+def greedy(cost):
+    """Matches rows to columns in order of increasing cost (each row and column at most once). Faster than the
+    Hungarian algorithm but not guaranteed to find the minimum total cost.
+
+    Parameters
+    ----------
+    cost : array like
+        Cost matrix with shape (n_rows, n_cols). Infinite costs mark pairs that must not be matched.
+
+    Returns
+    -------
+    rows, cols : np.ndarray
+        Indices of matched rows and columns (sorted by row).
+    """
+    cost = np.asarray(cost, dtype='float64')
+    rows, cols = np.nonzero(np.isfinite(cost))
+    return greedy_pairs(rows, cols, cost[rows, cols])
+
+
+def greedy_pairs(rows, cols, costs):
+    """Greedy matching (see greedy) of candidate pairs given as arrays of rows, columns and costs."""
+    order = np.argsort(costs, kind='stable')
+    matched_rows, matched_cols = set(), set()
+    keep = []
+    for k in order:
+        i, j = rows[k], cols[k]
+        if (i not in matched_rows) and (j not in matched_cols):
+            matched_rows.add(i)
+            matched_cols.add(j)
+            keep.append(k)
+    keep = np.array(keep, dtype='int64')
+    rows, cols = np.asarray(rows, dtype='int64')[keep], np.asarray(cols, dtype='int64')[keep]
+    order = np.argsort(rows)
+    return rows[order], cols[order]
+
+
+class GridIndex:
+    """Uniform grid of points for finding all pairs of points that are within a given distance of each other without
+    computing every pairwise distance.
+
+    Parameters
+    ----------
+    points : np.ndarray
+        Array of (x, y) coordinates with shape (n, 2).
+    cell_size : float
+        Size of the grid cells. Pairs can only be found up to this distance.
+    """
+
+    def __init__(self, points, cell_size):
+        self.points = np.asarray(points, dtype='float64').reshape(-1, 2)
+        self.cell_size = float(cell_size)
+        keys = self._keys(self._cells(self.points))
+        self.order = np.argsort(keys, kind='stable')
+        self.keys = keys[self.order]
+
+    def _cells(self, points):
+        return np.floor(points / self.cell_size).astype('int64')
+
+    @staticmethod
+    def _keys(cells):
+        # unique key for each cell (coordinates are shifted so that they are non-negative for any realistic image)
+        return (cells[:, 0] + 2 ** 20) * 2 ** 21 + (cells[:, 1] + 2 ** 20)
+
+    def query_pairs(self, points, radius):
+        """Finds all pairs (i, j) of indexed points i and query points j that are less than or equal to radius apart.
+
+        Parameters
+        ----------
+        points : np.ndarray
+            Array of (x, y) coordinates of the query points with shape (m, 2).
+        radius : float
+            Maximum distance between points (must not be greater than the cell size).
+
+        Returns
+        -------
+        i, j : np.ndarray
+            Indices of the indexed points and query points in each pair.
+        distances : np.ndarray
+            Distance between the points of each pair.
+        """
+        if radius > self.cell_size:
+            raise ValueError(f'Radius ({radius}) is larger than the cell size of the grid ({self.cell_size}).')
+        points = np.asarray(points, dtype='float64').reshape(-1, 2)
+        cells = self._cells(points)
+        i, j = [], []
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                keys = self._keys(cells + (dx, dy))
+                start = np.searchsorted(self.keys, keys, side='left')
+                stop = np.searchsorted(self.keys, keys, side='right')
+                counts = stop - start
+                query = np.repeat(np.arange(len(points)), counts)
+                offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+                i.append(self.order[np.repeat(start, counts) + offsets])
+                j.append(query)
+        i, j = np.concatenate(i), np.concatenate(j)
+        distances = np.linalg.norm(self.points[i] - points[j], axis=1)
+        keep = distances <= radius
+        return i[keep], j[keep], distances[keep]
+
+
+def _components(rows, cols, n_rows, n_cols):
+    """Labels the connected components of a bipartite graph given by edges (rows, cols). Returns the label of each
+    row and each column."""
+    labels = np.arange(n_rows + n_cols)
+    a, b = np.asarray(rows), n_rows + np.asarray(cols)
+    while True:  # propagate the minimum label along edges until nothing changes
+        previous = labels.copy()
+        low = np.minimum(labels[a], labels[b])
+        np.minimum.at(labels, a, low)
+        np.minimum.at(labels, b, low)
+        labels = labels[labels]
+        if np.array_equal(labels, previous):
+            return labels[:n_rows], labels[n_rows:]
+
+
+def assign(a, b, max_distance=np.inf, method='hungarian', grid_threshold=2500):
+    """Matches two sets of points by distance.
+
+    Parameters
+    ----------
+    a, b : np.ndarray
+        Arrays of (x, y) coordinates with shapes (n, 2) and (m, 2).
+    max_distance : float (default = inf)
+        Points further apart than this are never matched.
+    method : str {'hungarian', 'greedy'}
+        Whether to minimize the total distance between matched points (Hungarian algorithm) or match the closest pairs
+        first (greedy).
+    grid_threshold : int (default = 2500)
+        If max_distance is finite and n * m is larger than this, candidate pairs are found with a GridIndex instead of
+        computing the full distance matrix, and the Hungarian algorithm is solved separately for each group of points
+        that can be matched to each other.
+
+    Returns
+    -------
+    i, j : np.ndarray
+        Indices of matched points in a and b (sorted by i).
+    """
+    if method not in ('hungarian', 'greedy'):
+        raise ValueError(f'Unknown assignment method: {method!r}.')
+    a = np.asarray(a, dtype='float64').reshape(-1, 2)
+    b = np.asarray(b, dtype='float64').reshape(-1, 2)
+    if np.isfinite(max_distance) and (len(a) * len(b) > grid_threshold):
+        i, j, distances = GridIndex(a, max_distance).query_pairs(b, max_distance)
+        if method == 'greedy':
+            return greedy_pairs(i, j, distances)
+        row_labels, col_labels = _components(i, j, len(a), len(b))
+        matched_i, matched_j = [], []
+        for label in np.unique(row_labels[i]):
+            rows = np.nonzero(row_labels == label)[0]
+            cols = np.nonzero(col_labels == label)[0]
+            cost = np.full((len(rows), len(cols)), np.inf)
+            edges = row_labels[i] == label
+            cost[np.searchsorted(rows, i[edges]), np.searchsorted(cols, j[edges])] = distances[edges]
+            r, c = hungarian(cost)
+            matched_i.append(rows[r])
+            matched_j.append(cols[c])
+        if not matched_i:
+            return np.zeros(0, dtype='int64'), np.zeros(0, dtype='int64')
+        i, j = np.concatenate(matched_i), np.concatenate(matched_j)
+        order = np.argsort(i)
+        return i[order], j[order]
+    cost = np.linalg.norm(a[:, None] - b[None], axis=2)
+    cost[cost > max_distance] = np.inf
+    return hungarian(cost) if method == 'hungarian' else greedy(cost)
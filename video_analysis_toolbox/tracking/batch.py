@@ -0,0 +1,196 @@
+from ..video import Video
+from ..image_processing.contours import ContourDetector
+from ..utilities.data_structures import feature_dtype
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+import cv2
+import numpy as np
+import os
+import shutil
+
+
+def _init_worker():
+    cv2.setNumThreads(1)  # parallelism comes from the process pool
+
+
+def track_frames(video, detector: ContourDetector, first, last, chunk_size=100):
+    """Tracks the largest contours in a range of frames.
+
+    Parameters
+    ----------
+    video : Video
+        An open video.
+    detector : ContourDetector
+        Contour detector (detector.n objects are tracked in every frame).
+    first, last : int
+        Range of frames to track.
+    chunk_size : int (default = 100)
+        Number of frames that are decoded and processed at a time.
+
+    Returns
+    -------
+    features : np.ndarray (dtype = feature_dtype)
+        Array with shape (last - first, detector.n). Objects that are not found in a frame are NaN.
+    """
+    features = np.full((last - first, detector.n), np.nan, dtype=feature_dtype)
+    for start, stop, frames in video.iter_chunks(first, last, chunk_size):
+        contours = detector.find_contours_batch(frames)
+        counts = np.array([len(frame_contours) for frame_contours in contours])
+        info = detector.contour_info_batch([contour for frame_contours in contours for contour in frame_contours])
+        # position of each contour in the output array
+        rows = np.repeat(np.arange(start - first, stop - first), counts)
+        cols = np.arange(len(info)) - np.repeat(np.cumsum(counts) - counts, counts)
+        features[rows, cols] = info
+    return features
+
+
+def _frame_count(path) -> int:
+    """Reads the number of frames of a video without keeping a handle open (or loading the frames of a .npy file)."""
+    if Path(path).suffix == '.npy':
+        return len(np.load(path, mmap_mode='r'))
+    video = Video.open(path)
+    try:
+        return video.frame_count
+    finally:
+        video.release()
+
+
+def _track_part(path, detector, first, last, part, open_kwargs):
+    """Worker function: tracks a range of frames in a video and saves the result to a part file."""
+    video = Video.open(path, **open_kwargs)
+    features = track_frames(video, detector, first, last)
+    tmp = part.with_name(part.name + '.tmp')
+    with open(tmp, 'wb') as f:
+        np.save(f, features)
+    os.replace(tmp, part)  # parts only exist once they are complete, so interrupted runs can be resumed
+    return path, part
+
+
+class BatchTracker:
+    """Tracks objects in many videos in parallel.
+
+    Videos are split into ranges of frames that are tracked in a pool of worker processes, each of which opens its own
+    handle on the video. The features of each range are saved as a part file as soon as they are complete, and the
+    parts of a video are merged into a single .npy file (with shape (frame_count, n) and dtype feature_dtype) once all
+    of them are done. Running the tracker again on the same output directory skips finished videos and parts.
+
+    Parameters
+    ----------
+    detector : ContourDetector
+        Contour detector used to find objects (detector.n must be at least 1).
+    n_workers : int (optional)
+        Number of worker processes (defaults to the number of CPUs). If 0, videos are tracked in the calling process.
+    frames_per_task : int (default = 10000)
+        Maximum number of frames tracked by a worker in a single task.
+    open_kwargs : dict (optional)
+        Keyword arguments passed to Video.open in each worker.
+    """
+
+    def __init__(self, detector: ContourDetector, n_workers=None, frames_per_task=10000, open_kwargs=None):
+        if detector.n < 1:
+            raise ValueError('BatchTracker requires a ContourDetector with n >= 1.')
+        self.detector = detector
+        self.n_workers = os.cpu_count() if n_workers is None else n_workers
+        self.frames_per_task = frames_per_task
+        self.open_kwargs = dict(open_kwargs) if open_kwargs else {}
+
+    @staticmethod
+    def keys(videos) -> dict:
+        """Returns a unique key for each video: its path relative to the deepest directory containing all the videos,
+        without the suffix (i.e. the name of the video if they are all in the same directory).
+
+        Raises
+        ------
+        ValueError
+            If two videos have the same key (e.g. the same file listed twice, or rec.avi and rec.npy).
+        """
+        resolved = {str(path): Path(path).resolve() for path in videos}
+        root = Path(os.path.commonpath([path.parent for path in resolved.values()])) if resolved else Path()
+        keys = {}
+        for path, full_path in resolved.items():
+            key = full_path.relative_to(root).with_suffix('').as_posix()
+            if key in keys.values():
+                raise ValueError(f'More than one video would be saved as {key}.')
+            keys[path] = key
+        return keys
+
+    @staticmethod
+    def output_path(key, output_directory) -> Path:
+        return Path(output_directory, key + '.npy')
+
+    @staticmethod
+    def parts_directory(key, output_directory) -> Path:
+        return Path(output_directory, key + '.parts')
+
+    def _tasks(self, videos, output_directory):
+        """Returns (path, first, last, part) for every part that still needs to be tracked, and all the parts of each
+        unfinished video."""
+        parts = {}
+        tasks = []
+        for path, key in videos.items():
+            if self.output_path(key, output_directory).exists():
+                continue
+            directory = self.parts_directory(key, output_directory)
+            directory.mkdir(parents=True, exist_ok=True)
+            frame_count = _frame_count(path)  # each worker opens its own handle on the video
+            parts[path] = []
+            for first in range(0, frame_count, self.frames_per_task):
+                last = min(first + self.frames_per_task, frame_count)
+                part = directory.joinpath(f'{first:010d}_{last:010d}.npy')
+                parts[path].append(part)
+                if not part.exists():
+                    tasks.append((path, first, last, part))
+        return tasks, parts
+
+    def _merge(self, key, parts, output_directory):
+        """Concatenates the parts of a video into its output file and removes the parts."""
+        output = self.output_path(key, output_directory)
+        features = np.concatenate([np.load(part) for part in parts]) if parts else \
+            np.zeros((0, self.detector.n), dtype=feature_dtype)
+        tmp = output.with_name(output.name + '.tmp')
+        with open(tmp, 'wb') as f:
+            np.save(f, features)
+        os.replace(tmp, output)
+        shutil.rmtree(self.parts_directory(key, output_directory))
+        return output
+
+    def run(self, videos, output_directory):
+        """Tracks videos, saving the features of each video to output_directory.
+
+        Parameters
+        ----------
+        videos : list
+            Paths to video files.
+        output_directory : str or Path
+            Directory where the output of each video is saved (as <key>.npy, see keys, so videos in subdirectories
+            are saved in the same subdirectories of output_directory).
+
+        Returns
+        -------
+        outputs : dict
+            Path to the output file for each video.
+        """
+        videos = self.keys(videos)
+        output_directory = Path(output_directory)
+        output_directory.mkdir(parents=True, exist_ok=True)
+        tasks, parts = self._tasks(videos, output_directory)
+        remaining = {path: sum(task[0] == path for task in tasks) for path in parts}
+        for path, n in remaining.items():
+            if n == 0:
+                self._merge(videos[path], parts[path], output_directory)
+        if self.n_workers == 0:
+            for path, first, last, part in tasks:
+                _track_part(path, self.detector, first, last, part, self.open_kwargs)
+                remaining[path] -= 1
+                if remaining[path] == 0:
+                    self._merge(videos[path], parts[path], output_directory)
+        else:
+            with ProcessPoolExecutor(max_workers=self.n_workers, initializer=_init_worker) as pool:
+                futures = [pool.submit(_track_part, path, self.detector, first, last, part, self.open_kwargs)
+                           for path, first, last, part in tasks]
+                for future in as_completed(futures):
+                    path, part = future.result()
+                    remaining[path] -= 1
+                    if remaining[path] == 0:
+                        self._merge(videos[path], parts[path], output_directory)
+        return {path: self.output_path(key, output_directory) for path, key in videos.items()}
@@ -0,0 +1,173 @@
+from ..image_processing.contours import ContourDetector
+from ..utilities.data_structures import feature_dtype
+from .assignment import assign
+import numpy as np
+
+
+class MultiObjectTracker:
+    """Tracks several objects, keeping the identity of each object from frame to frame.
+
+    In every frame, the objects found by the detector are matched to the last known positions of the identities being
+    tracked by minimizing the distance between them (see assignment.assign). Objects that cannot be matched start new
+    identities, and identities that are not matched in a frame are NaN in that frame. An identity that has not been
+    matched for more than max_missed frames is no longer matched by position; its slot can be taken over by a new
+    object if the number of identities is limited.
+
+    Parameters
+    ----------
+    detector : ContourDetector
+        Contour detector used to find objects.
+    n_objects : int (optional)
+        Maximum number of identities. If None, a new identity is created for every object that cannot be matched.
+    max_distance : float (default = inf)
+        Maximum distance (in pixels) an object can move between frames and keep its identity.
+    max_missed : int (default = 10)
+        Number of frames an identity can go unmatched before it is considered lost.
+    method : str {'hungarian', 'greedy'}
+        Assignment method (see assignment.assign).
+
+    Attributes
+    ----------
+    n_identities : int
+        Number of identities created since the last reset.
+    positions : np.ndarray
+        Last known (x, y) position of each identity, shape (n_identities, 2).
+    last_seen : np.ndarray
+        Frame index at which each identity was last matched.
+    """
+
+    def __init__(self, detector: ContourDetector, n_objects=None, max_distance=np.inf, max_missed=10,
+                 method='hungarian'):
+        self.detector = detector
+        self.n_objects = n_objects
+        self.max_distance = max_distance
+        self.max_missed = max_missed
+        self.method = method
+        self.reset()
+
+    def reset(self):
+        """Forgets all identities."""
+        capacity = 16 if self.n_objects is None else self.n_objects
+        self._positions = np.full((capacity, 2), np.nan)
+        self._last_seen = np.zeros(capacity, dtype='int64')
+        self.n_identities = 0
+        self.i = 0
+
+    @property
+    def positions(self) -> np.ndarray:
+        return self._positions[:self.n_identities]
+
+    @property
+    def last_seen(self) -> np.ndarray:
+        return self._last_seen[:self.n_identities]
+
+    def _new_identities(self, n):
+        """Returns slots for up to n new identities, growing the state arrays if the number is unlimited, or taking
+        over lost identities if it is limited."""
+        if self.n_objects is None:
+            if self.n_identities + n > len(self._positions):
+                capacity = max(2 * len(self._positions), self.n_identities + n)
+                self._positions = np.concatenate([self._positions, np.full((capacity - len(self._positions), 2),
+                                                                           np.nan)])
+                self._last_seen = np.concatenate([self._last_seen,
+                                                  np.zeros(capacity - len(self._last_seen), dtype='int64')])
+            slots = np.arange(self.n_identities, self.n_identities + n)
+            self.n_identities += n
+            return slots
+        m = min(n, self.n_objects - self.n_identities)
+        slots = np.arange(self.n_identities, self.n_identities + m)
+        self.n_identities += m
+        if m < n:  # reuse the identities that have been lost for longest
+            lost = np.nonzero(self.i - self.last_seen > self.max_missed)[0]
+            lost = lost[np.argsort(self.last_seen[lost], kind='stable')][:n - m]
+            slots = np.concatenate([slots, lost])
+        return slots
+
+    def detect(self, image) -> np.ndarray:
+        """Returns the features of the objects found in an image (array with dtype feature_dtype)."""
+        return self.detector.contour_info_batch(self.detector.find_contours(image))
+
+    def update(self, features, out=None) -> np.ndarray:
+        """Assigns identities to the objects found in the next frame.
+
+        Parameters
+        ----------
+        features : np.ndarray
+            Features of the objects found in the frame (dtype = feature_dtype).
+        out : np.ndarray (optional)
+            Array where the features of each identity are written (dtype = feature_dtype). Must have space for at least
+            n_identities after the update (n_objects if limited); identities that are not found are set to NaN.
+
+        Returns
+        -------
+        identities : np.ndarray
+            Identity assigned to each object (-1 if none).
+        """
+        xy = np.stack([features['x'], features['y']], axis=1)
+        identities = np.full(len(features), -1, dtype='int64')
+        active = np.nonzero(self.i - self.last_seen <= self.max_missed)[0]
+        if len(active) and len(xy):
+            rows, cols = assign(self.positions[active], xy, self.max_distance, self.method)
+            identities[cols] = active[rows]
+        unmatched = np.nonzero(identities < 0)[0]
+        if len(unmatched):
+            slots = self._new_identities(len(unmatched))
+            identities[unmatched[:len(slots)]] = slots
+        found = identities >= 0
+        self._positions[identities[found]] = xy[found]
+        self._last_seen[identities[found]] = self.i
+        if out is not None:
+            out[:] = (np.nan, np.nan, np.nan)
+            out[identities[found]] = features[found]
+        self.i += 1
+        return identities
+
+    def track(self, image, out=None) -> np.ndarray:
+        """Finds the objects in an image and assigns identities to them (see update)."""
+        return self.update(self.detect(image), out)
+
+    def track_video(self, video, first=0, last=None, chunk_size=100, out=None) -> np.ndarray:
+        """Tracks the identities in a range of frames of a video (continuing from the current identities).
+
+        Parameters
+        ----------
+        video : Video
+            An open video.
+        first, last : int (optional)
+            Range of frames to track (defaults to the whole video).
+        chunk_size : int (default = 100)
+            Number of frames decoded and processed at a time.
+        out : np.ndarray (optional)
+            Preallocated array with shape (n_frames, n_identities) and dtype feature_dtype (e.g. a memory-mapped
+            array). Required to have n_objects columns if n_objects is limited.
+
+        Returns
+        -------
+        tracks : np.ndarray (dtype = feature_dtype)
+            Features of each identity in each frame, shape (n_frames, n_identities). NaN where an identity is not
+            found.
+        """
+        last = video.frame_count if last is None else last
+        n_frames = last - first
+        allocated = out is None
+        if allocated:
+            width = self.n_objects if self.n_objects is not None else len(self._positions)
+            out = np.full((n_frames, width), np.nan, dtype=feature_dtype)
+        elif len(out) != n_frames:
+            raise ValueError(f'Output array has space for {len(out)} frames but {n_frames} frames were requested.')
+        elif (self.n_objects is not None) and (out.shape[1] < self.n_objects):
+            raise ValueError(f'Output array has space for {out.shape[1]} identities but n_objects is '
+                             f'{self.n_objects}.')
+        for start, stop, frames in video.iter_chunks(first, last, chunk_size):
+            contours = self.detector.find_contours_batch(frames)
+            for f, frame_contours in zip(range(start, stop), contours):
+                features = self.detector.contour_info_batch(frame_contours)
+                if (self.n_objects is None) and (self.n_identities + len(features) > out.shape[1]):
+                    if not allocated:
+                        raise ValueError(f'Output array has space for {out.shape[1]} identities but more were found.')
+                    grown = np.full((n_frames, max(2 * out.shape[1], self.n_identities + len(features))), np.nan,
+                                    dtype=feature_dtype)
+                    grown[:, :out.shape[1]] = out
+                    out = grown
+                self.update(features, out[f - first])
+        return out[:, :self.n_identities] if (allocated and self.n_objects is None) else out
@@ -0,0 +1,212 @@
+from ..utilities.data_structures import feature_dtype
+from pathlib import Path
+import numpy as np
+import os
+import threading
+import uuid
+
+
+class ResultsStore:
+    """Appendable on-disk store of tracking results, keyed by video and frame number.
+
+    Results are buffered in memory (up to buffer_size frames for each video) and written as chunks. Each chunk is an
+    uncompressed .npz file containing one array per column (the frame numbers and each field of the dtype), named by
+    the range of frames it contains:
+
+        <directory>/<video key>/<first frame:010d>_<last frame:010d>_<chunk number:06d>.npz
+
+    Chunks are written to a temporary file and renamed once complete, so a crash can lose at most the results that are
+    still buffered and never leaves a partial chunk. Reading a range of frames only opens the chunks that overlap it,
+    and only loads the columns that are requested.
+
+    The chunks of a video are numbered by the store that writes them, so each video should only be written by one
+    store at a time (other stores, e.g. of other processes, may write other videos in the same directory). Temporary
+    files are named after the store that writes them and are ignored when reading.
+
+    Parameters
+    ----------
+    directory : str or Path
+        Directory of the store (created if it does not exist).
+    dtype : np.dtype (default = feature_dtype)
+        Structured dtype of the results of each object.
+    n_objects : int (default = 1)
+        Number of objects stored for each frame (results have shape (n_frames, n_objects), or (n_frames,) if n_objects
+        is None).
+    buffer_size : int (default = 10000)
+        Maximum number of frames buffered for each video before they are written to disk.
+    """
+
+    suffix = '.npz'
+
+    def __init__(self, directory, dtype=feature_dtype, n_objects=1, buffer_size=10000):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.dtype = np.dtype(dtype)
+        self.n_objects = n_objects
+        self.row_shape = () if n_objects is None else (n_objects,)
+        self.buffer_size = buffer_size
+        self._buffers = {}
+        self._next_chunk = {}  # number of the next chunk written for each video
+        self._token = uuid.uuid4().hex[:12]  # identifies the temporary files of this store
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.flush()
+
+    def _video_directory(self, key) -> Path:
+        key = str(key)
+        if (not key) or (Path(key).name != key) or key.startswith('.'):
+            raise ValueError(f'{key!r} is not a valid video key.')
+        return self.directory.joinpath(key)
+
+    def _chunks(self, key) -> list:
+        """Returns (first, last, path) of each chunk of a video, sorted by chunk number."""
+        directory = self._video_directory(key)
+        chunks = []
+        for path in directory.glob('*' + self.suffix):
+            first, last, number = path.stem.split('_')
+            chunks.append((int(number), int(first), int(last), path))
+        return [(first, last, path) for number, first, last, path in sorted(chunks)]
+
+    def keys(self) -> list:
+        """Keys of the videos in the store (including results that have not been flushed yet)."""
+        keys = {path.name for path in self.directory.iterdir() if path.is_dir()}
+        return sorted(keys | set(self._buffers))
+
+    def append(self, key, frames, results):
+        """Adds the results of some frames of a video.
+
+        Parameters
+        ----------
+        key : str
+            Key of the video (e.g. the name of the video file without its suffix).
+        frames : int or array like
+            Frame number(s).
+        results : np.ndarray or feature_vector
+            Results of each frame, with shape (n_frames,) + row_shape (or row_shape for a single frame) and the dtype
+            of the store. A single feature_vector (or tuple of fields) can be given for a single object.
+        """
+        frames = np.atleast_1d(np.asarray(frames, dtype='int64'))
+        if not isinstance(results, np.ndarray):
+            results = np.array(tuple(results), dtype=self.dtype)
+        results = np.broadcast_to(results.astype(self.dtype, copy=False), (len(frames),) + self.row_shape)
+        with self._lock:
+            if key not in self._buffers:
+                self._video_directory(key)  # check the key before buffering anything
+                self._buffers[key] = (np.empty(self.buffer_size, dtype='int64'),
+                                      np.empty((self.buffer_size,) + self.row_shape, dtype=self.dtype), [0])
+            buffered_frames, buffered_results, n = self._buffers[key]
+            i = 0
+            while i < len(frames):
+                m = min(len(frames) - i, self.buffer_size - n[0])
+                buffered_frames[n[0]:n[0] + m] = frames[i:i + m]
+                buffered_results[n[0]:n[0] + m] = results[i:i + m]
+                n[0] += m
+                i += m
+                if n[0] == self.buffer_size:
+                    self._flush(key)
+
+    def _flush(self, key):
+        """Writes the buffered results of a video to a new chunk (the lock must be held)."""
+        if key not in self._buffers:
+            return
+        frames, results, n = self._buffers[key]
+        if n[0] > 0:
+            self._write(key, frames[:n[0]], results[:n[0]])
+            n[0] = 0
+
+    def _write(self, key, frames, results):
+        """Writes results to a new chunk of a video (the lock must be held)."""
+        order = np.argsort(frames, kind='stable')
+        frames, results = frames[order], results[order]
+        directory = self._video_directory(key)
+        if key not in self._next_chunk:  # continue the numbering of existing chunks
+            directory.mkdir(exist_ok=True)
+            self._next_chunk[key] = max([int(path.stem.split('_')[2]) for first, last, path in self._chunks(key)],
+                                        default=-1) + 1
+        number = self._next_chunk[key]
+        path = directory.joinpath(f'{frames[0]:010d}_{frames[-1]:010d}_{number:06d}{self.suffix}')
+        tmp = path.with_name(f'{path.name}.{self._token}.tmp')
+        try:
+            with open(tmp, 'wb') as f:
+                np.savez(f, frame=frames, **{name: results[name] for name in self.dtype.names})
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, path)
+        except BaseException:
+            if tmp.exists():
+                tmp.unlink()
+            raise
+        self._next_chunk[key] = number + 1
+
+    def flush(self, key=None):
+        """Writes buffered results to disk (for one video, or all videos if key is None)."""
+        with self._lock:
+            for k in ([key] if key is not None else list(self._buffers)):
+                self._flush(k)
+
+    def read(self, key, first=None, last=None, columns=None):
+        """Reads the results of a range of frames of a video (flushing any buffered results first).
+
+        Parameters
+        ----------
+        key : str
+            Key of the video.
+        first, last : int (optional)
+            Range of frames to read (first <= frame < last). Defaults to all frames.
+        columns : list (optional)
+            Fields of the dtype to read (defaults to all of them).
+
+        Returns
+        -------
+        frames : np.ndarray
+            Frame numbers (sorted).
+        results : np.ndarray
+            Results of each frame, with shape (n_frames,) + row_shape. If a frame was appended more than once, the
+            most recent results are returned.
+        """
+        self.flush(key)
+        with self._lock:
+            return self._read(key, first, last, columns)
+
+    def _read(self, key, first=None, last=None, columns=None):
+        first = -np.inf if first is None else first
+        last = np.inf if last is None else last
+        columns = list(self.dtype.names) if columns is None else list(columns)
+        dtype = np.dtype([(name, self.dtype[name]) for name in columns])
+        frames, results = [], []
+        for chunk_first, chunk_last, path in self._chunks(key):
+            if (chunk_last < first) or (chunk_first >= last):
+                continue
+            with np.load(path) as chunk:
+                chunk_frames = chunk['frame']
+                i, j = np.searchsorted(chunk_frames, [first, last])
+                frames.append(chunk_frames[i:j])
+                chunk_results = np.empty((j - i,) + self.row_shape, dtype=dtype)
+                for name in columns:
+                    chunk_results[name] = chunk[name][i:j]
+                results.append(chunk_results)
+        if not frames:
+            return np.zeros(0, dtype='int64'), np.zeros((0,) + self.row_shape, dtype=dtype)
+        frames, results = np.concatenate(frames), np.concatenate(results)
+        if len(results) > 1:  # sort by frame, keeping the last appended results for each frame
+            order = np.argsort(frames, kind='stable')
+            frames, results = frames[order], results[order]
+            keep = np.append(frames[1:] != frames[:-1], True)
+            frames, results = frames[keep], results[keep]
+        return frames, results
+
+    def compact(self, key):
+        """Rewrites all the chunks of a video as a single chunk (faster to read)."""
+        with self._lock:
+            self._flush(key)
+            chunks = self._chunks(key)
+            if len(chunks) > 1:
+                frames, results = self._read(key)
+                self._write(key, frames, results)
+                # if interrupted here, the old chunks are redundant: the new chunk takes precedence when reading
+                for first, last, path in chunks:
+                    path.unlink()
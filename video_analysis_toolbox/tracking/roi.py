@@ -0,0 +1,94 @@
+from ..image_processing.contours import ContourDetector
+from ..image_processing.cropping import Cropper
+import numpy as np
+
+
+class ROITracker(Cropper):
+    """Tracks contours within a search window around the contours found in the previous frame.
+
+    Thresholding and contour search are restricted to the bounding box of the previous contours (padded by pad), so
+    that the cost of each frame scales with the size of the window rather than the size of the image. The whole image
+    is searched in the first frame, whenever nothing is found within the window, and whenever a contour touches the
+    edge of the window (i.e. the object may extend beyond it).
+
+    Parameters
+    ----------
+    detector : ContourDetector
+        Contour detector used to find contours.
+    pad : tuple (x_pad, y_pad) (default = (20, 20))
+        Number of pixels around the bounding box of the previous contours to include in the search window.
+
+    Attributes
+    ----------
+    contours : list
+        Contours found in the last frame (in full-frame coordinates).
+    n_frames : int
+        Number of frames tracked since the last reset.
+    n_full_frame : int
+        Number of frames in which the whole image was searched.
+    """
+
+    def __init__(self, detector: ContourDetector, pad=(20, 20), *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.detector = detector
+        self.pad = np.asarray(pad)
+        self.reset()
+
+    def reset(self):
+        """Forgets the previous contours, so that the next frame is searched in full."""
+        self.contours = []
+        self.n_frames = 0
+        self.n_full_frame = 0
+
+    def _search_window(self, image):
+        """Returns the cropped search window and the offset of its top left corner (None if there is no window)."""
+        if len(self.contours) == 0:
+            return None, None
+        points = np.concatenate([contour.reshape(-1, 2) for contour in self.contours])
+        cropped, p1, p2 = self.crop_to_contour(image, points, self.pad)
+        if cropped.shape == image.shape:
+            return None, None
+        return cropped, p1
+
+    @staticmethod
+    def _touches_edge(contours, window_shape, p1, image_shape):
+        """Checks whether any contour touches an edge of the window that is not also an edge of the image."""
+        h, w = window_shape[:2]
+        for contour in contours:
+            xmin, ymin = contour.reshape(-1, 2).min(axis=0)
+            xmax, ymax = contour.reshape(-1, 2).max(axis=0)
+            if ((xmin == 0) and (p1[0] > 0)) or ((ymin == 0) and (p1[1] > 0)) or \
+                    ((xmax == w - 1) and (p1[0] + w < image_shape[1])) or \
+                    ((ymax == h - 1) and (p1[1] + h < image_shape[0])):
+                return True
+        return False
+
+    def find_contours(self, image):
+        """Finds contours in an image, searching around the previous contours first.
+
+        Parameters
+        ----------
+        image : np.ndarray
+            Unsigned 8-bit integer array.
+
+        Returns
+        -------
+        contours : list
+            Contours sorted by area (largest first), in full-frame coordinates.
+        """
+        self.n_frames += 1
+        window, p1 = self._search_window(image)
+        if window is not None:
+            contours = self.detector.find_contours(window, offset=p1)
+            if len(contours) and not self._touches_edge(contours, window.shape, p1, image.shape):
+                self.contours = [contour + p1.astype(contour.dtype) for contour in contours]
+                return self.contours
+        self.n_full_frame += 1
+        self.contours = self.detector.find_contours(image)
+        return self.contours
+
+    def track(self, image):
+        """Returns the centre and orientation of the largest contour in an image (None if no contour is found)."""
+        contours = self.find_contours(image)
+        if len(contours):
+            return self.detector.contour_info(contours[0])
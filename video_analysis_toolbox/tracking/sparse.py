@@ -0,0 +1,130 @@
+from ..image_processing.contours import ContourDetector
+from ..utilities.data_structures import feature_dtype
+import numpy as np
+
+
+def _angle_difference(a, b):
+    """Difference between orientations (which are only defined modulo pi), in the range [-pi / 2, pi / 2)."""
+    return (b - a + np.pi / 2) % np.pi - np.pi / 2
+
+
+class SparseTracker:
+    """Tracks objects in every step-th frame, and only in every frame where they move.
+
+    Frames are sampled every step frames. If the objects have not moved by more than tolerance between two samples, the
+    frames in between are not analyzed and their features are linearly interpolated. Otherwise, frames are analyzed
+    one by one from the first sample, reading forward through the video, until the objects have stayed still for step
+    frames, after which sampling resumes. The number of frames that are analyzed therefore drops in proportion to the
+    time the objects spend still.
+
+    Whether the frames between samples also need to be decoded depends on the video: a video file seeks to the next
+    sample only if that skips more than max_decode_forward frames beyond the last frame read (see _VideoFile._seek),
+    i.e. if step is larger than max_decode_forward and a keyframe lies close enough before the sample. Otherwise it
+    decodes forward, which is cheaper than seeking, and only the analysis is skipped.
+
+    Movements that start and end between two samples at the same position (i.e. last less than step frames) are not
+    detected.
+
+    Parameters
+    ----------
+    detector : ContourDetector
+        Contour detector (detector.n objects are tracked in every frame, so detector.n must be at least 1).
+    step : int (default = 10)
+        Interval between sampled frames.
+    tolerance : float (default = 1.0)
+        Maximum distance (in pixels) an object can move between samples and still be considered stationary.
+    angle_tolerance : float (default = 0.1)
+        Maximum change in orientation (in radians) of a stationary object.
+
+    Attributes
+    ----------
+    analyzed : np.ndarray
+        Boolean array of the frames analyzed in the last call to track (frames that are False were interpolated).
+    """
+
+    def __init__(self, detector: ContourDetector, step=10, tolerance=1.0, angle_tolerance=0.1):
+        if detector.n < 1:
+            raise ValueError('SparseTracker requires a ContourDetector with n >= 1.')
+        self.detector = detector
+        self.step = step
+        self.tolerance = tolerance
+        self.angle_tolerance = angle_tolerance
+        self.analyzed = np.zeros(0, dtype=bool)
+
+    @property
+    def n_analyzed(self) -> int:
+        return int(self.analyzed.sum())
+
+    def analyze(self, frame, out):
+        """Writes the features of the largest objects in a frame into out (NaN for objects that are not found)."""
+        out[:] = (np.nan, np.nan, np.nan)
+        contours = self.detector.find_contours(frame)[:self.detector.n]
+        out[:len(contours)] = self.detector.contour_info_batch(contours)
+
+    def stationary(self, a, b) -> bool:
+        """Checks whether objects are stationary between two frames (features a and b). Objects that are missing in
+        both frames count as stationary, objects that are missing in only one do not."""
+        missing_a, missing_b = np.isnan(a['x']), np.isnan(b['x'])
+        if np.any(missing_a != missing_b):
+            return False
+        a, b = a[~missing_a], b[~missing_b]
+        return bool(np.all(np.hypot(b['x'] - a['x'], b['y'] - a['y']) <= self.tolerance) and
+                    np.all(np.abs(_angle_difference(a['angle'], b['angle'])) <= self.angle_tolerance))
+
+    @staticmethod
+    def interpolate(features, i, j):
+        """Linearly interpolates features between rows i and j (exclusive)."""
+        t = (np.arange(i + 1, j) - i)[:, None] / (j - i)
+        a, b = features[i], features[j]
+        for name in ('x', 'y'):
+            features[name][i + 1:j] = a[name] + t * (b[name] - a[name])
+        angle = a['angle'] + t * _angle_difference(a['angle'], b['angle'])
+        features['angle'][i + 1:j] = (angle + np.pi / 2) % np.pi - np.pi / 2
+
+    def track(self, video, first=0, last=None, out=None) -> np.ndarray:
+        """Tracks a range of frames of a video.
+
+        Parameters
+        ----------
+        video : Video
+            An open video.
+        first, last : int (optional)
+            Range of frames to track (defaults to the whole video).
+        out : np.ndarray (optional)
+            Preallocated array with shape (last - first, detector.n) and dtype feature_dtype.
+
+        Returns
+        -------
+        features : np.ndarray (dtype = feature_dtype)
+            Array with shape (last - first, detector.n). Objects that are not found in a frame are NaN.
+        """
+        last = video.frame_count if last is None else last
+        n = last - first
+        if out is None:
+            out = np.full((n, self.detector.n), np.nan, dtype=feature_dtype)
+        elif len(out) != n:
+            raise ValueError(f'Output array has space for {len(out)} frames but {n} frames were requested.')
+        self.analyzed = np.zeros(n, dtype=bool)
+        if n == 0:
+            return out
+        self.analyze(video.grab_frame(first), out[0])
+        self.analyzed[0] = True
+        i = 0
+        while i < n - 1:
+            j = min(i + self.step, n - 1)
+            self.analyze(video.grab_frame(first + j), out[j])
+            self.analyzed[j] = True
+            if self.stationary(out[i], out[j]):
+                self.interpolate(out, i, j)
+                i = j
+                continue
+            # moving: analyze every frame until the objects have been still for step frames
+            video.set_frame(first + i + 1)
+            start = i
+            while i < n - 1:
+                i += 1
+                self.analyze(video.advance_frame(), out[i])
+                self.analyzed[i] = True
+                if (i - start >= self.step) and self.stationary(out[i - self.step], out[i]):
+                    break
+        return out
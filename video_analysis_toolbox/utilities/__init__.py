@@ -1,2 +1,3 @@
 from .keyboard_interaction import KeyboardInteraction
-from . data_structures import feature_vector, TrackingError
+from . data_structures import feature_vector, feature_dtype, TrackingError
+from .profiling import Profiler, profiler
@@ -1,4 +1,5 @@
 from collections import namedtuple
+import numpy as np
 
 
 class Error(Exception):
@@ -17,3 +18,6 @@ class TrackingError(Error):
 
 # Feature vector for storing the x_position, y_position and orientation of an object
 feature_vector = namedtuple('feature_vector', ('x', 'y', 'angle'))
+
+# Structured array dtype with the same fields as feature_vector (for storing the features of many objects)
+feature_dtype = np.dtype([('x', 'float64'), ('y', 'float64'), ('angle', 'float64')])
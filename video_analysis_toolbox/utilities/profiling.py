@@ -0,0 +1,158 @@
+from contextlib import contextmanager, nullcontext
+import functools
+import json
+import numpy as np
+import threading
+import time
+
+
+class Profiler:
+    """Records the latency of stages of the tracking pipeline and counts events (e.g. frame errors).
+
+    Profiling is disabled by default. While disabled, profiled functions only check the enabled flag before calling
+    through, so instrumentation can stay in place in production code. Latencies are binned in log-spaced histograms
+    (1 us to 10 s, 20 bins per decade) so that recording does not grow memory with the number of calls.
+
+    Nested calls to the same stage (e.g. an overridden method calling the method of the base class) are only timed
+    once, at the outermost call.
+    """
+
+    bin_edges = 10. ** np.arange(-6, 1 + 1e-9, 0.05)
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._null = nullcontext()
+        self.reset()
+
+    def reset(self):
+        """Discards everything recorded so far."""
+        with self._lock:
+            self.stages = {}
+            self.counters = {}
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    @contextmanager
+    def profiling(self, reset=True):
+        """Enables profiling within a with block (discarding previous records if reset is True)."""
+        if reset:
+            self.reset()
+        enabled = self.enabled
+        self.enabled = True
+        try:
+            yield self
+        finally:
+            self.enabled = enabled
+
+    def record(self, stage, seconds):
+        """Records the time taken by one call of a stage."""
+        i = np.searchsorted(self.bin_edges, seconds)
+        with self._lock:
+            if stage not in self.stages:
+                self.stages[stage] = dict(n=0, total=0., min=np.inf, max=0.,
+                                          histogram=np.zeros(len(self.bin_edges) + 1, dtype='int64'))
+            record = self.stages[stage]
+            record['n'] += 1
+            record['total'] += seconds
+            record['min'] = min(record['min'], seconds)
+            record['max'] = max(record['max'], seconds)
+            record['histogram'][i] += 1
+
+    def count(self, counter, n=1):
+        """Increments a counter (if profiling is enabled)."""
+        if self.enabled:
+            with self._lock:
+                self.counters[counter] = self.counters.get(counter, 0) + n
+
+    def _active(self):
+        try:
+            return self._local.active
+        except AttributeError:
+            self._local.active = set()
+            return self._local.active
+
+    @contextmanager
+    def _timed(self, name):
+        active = self._active()
+        if name in active:
+            yield
+            return
+        active.add(name)
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - t0)
+            active.discard(name)
+
+    def stage(self, name):
+        """Context manager that times the code in a with block as a stage (does nothing if profiling is disabled)."""
+        if not self.enabled:
+            return self._null
+        return self._timed(name)
+
+    def __call__(self, name):
+        """Decorator that times every call of a function as a stage."""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with self._timed(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def _percentile(self, record, q):
+        """Upper edge of the histogram bin containing the qth percentile, clamped to the range of recorded times."""
+        histogram = record['histogram']
+        i = np.searchsorted(np.cumsum(histogram), q / 100. * histogram.sum())
+        return float(np.clip(self.bin_edges[min(i, len(self.bin_edges) - 1)], record['min'], record['max']))
+
+    def summary(self) -> dict:
+        """Statistics of each stage (times in seconds; percentiles are accurate to the histogram bins) and the
+        counters."""
+        with self._lock:
+            stages = {name: dict(n=record['n'],
+                                 total=record['total'],
+                                 mean=record['total'] / record['n'],
+                                 min=record['min'],
+                                 max=record['max'],
+                                 p50=self._percentile(record, 50),
+                                 p90=self._percentile(record, 90),
+                                 p99=self._percentile(record, 99))
+                      for name, record in self.stages.items()}
+            return dict(stages=stages, counters=dict(self.counters))
+
+    def report(self) -> str:
+        """Summary formatted as a table (times in milliseconds)."""
+        summary = self.summary()
+        lines = [f"{'stage':32s} {'n':>8s} {'total':>10s} {'mean':>9s} "
+                 f"{'p50':>9s} {'p90':>9s} {'p99':>9s} {'max':>9s}"]
+        for name, s in sorted(summary['stages'].items(), key=lambda item: -item[1]['total']):
+            lines.append(f"{name:32s} {s['n']:8d} {1000 * s['total']:10.1f} {1000 * s['mean']:9.3f} "
+                         f"{1000 * s['p50']:9.3f} {1000 * s['p90']:9.3f} {1000 * s['p99']:9.3f} "
+                         f"{1000 * s['max']:9.3f}")
+        for name, n in sorted(summary['counters'].items()):
+            lines.append(f'{name:32s} {n:8d}')
+        return '\n'.join(lines)
+
+    def save(self, path):
+        """Writes the summary, the histograms of each stage and the histogram bin edges to a json file."""
+        summary = self.summary()
+        with self._lock:
+            for name, record in self.stages.items():
+                summary['stages'][name]['histogram'] = record['histogram'].tolist()
+        summary['bin_edges'] = self.bin_edges.tolist()
+        with open(path, 'w') as f:
+            json.dump(summary, f, indent=2)
+
+
+# Profiler shared by the whole toolbox
+profiler = Profiler()
@@ -0,0 +1,49 @@
+from pathlib import Path
+import numpy as np
+
+
+def sidecar_path(path, suffix) -> Path:
+    """Returns the path of the sidecar file with a given suffix next to a file (e.g. video.avi.keyframes.npz)."""
+    path = Path(path)
+    return path.with_name(path.name + suffix)
+
+
+def load_sidecar(path, suffix, *keys):
+    """Loads arrays cached in the .npz sidecar file of a file.
+
+    Parameters
+    ----------
+    path : str or Path
+        Path to the file that the cached data were computed from.
+    suffix : str
+        Suffix of the sidecar file.
+    keys : str
+        Names of the arrays to load.
+
+    Returns
+    -------
+    tuple or None
+        The arrays, or None if the sidecar does not exist, cannot be read, lacks one of the arrays, or was saved for a
+        different version of the file (size or modification time changed).
+    """
+    path = Path(path)
+    sidecar = sidecar_path(path, suffix)
+    if not sidecar.exists():
+        return None
+    stat = path.stat()
+    try:
+        with np.load(sidecar) as data:
+            if (int(data['size']) != stat.st_size) or (int(data['mtime']) != stat.st_mtime_ns):
+                return None
+            return tuple(data[key] for key in keys)
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def save_sidecar(path, suffix, **arrays):
+    """Saves arrays to the .npz sidecar file of a file, together with the size and modification time of the file so
+    that load_sidecar can detect when they are out of date."""
+    path = Path(path)
+    stat = path.stat()
+    with open(sidecar_path(path, suffix), 'wb') as f:
+        np.savez(f, size=stat.st_size, mtime=stat.st_mtime_ns, **arrays)
@@ -1,7 +1,15 @@
-from ..utilities import KeyboardInteraction
+from ..utilities import KeyboardInteraction, profiler
+from concurrent.futures import ThreadPoolExecutor
+from .cache import FrameCache
+from .playback import PlaybackClock
+from .pool import capture_pool
+from .prefetch import FramePrefetcher
+from .seek_index import KeyframeIndex, read_avi_fourcc
 import cv2
+import functools
 import numpy as np
 from pathlib import Path
+import threading
 import warnings
 
 
@@ -11,12 +19,24 @@ class FrameErrorWarning(UserWarning):
         super().__init__(*args)
 
 
+def _locked(method):
+    """Runs a method while holding the lock of the video, so that the capture object cannot be released (e.g. by the
+    capture pool, from another thread) while the method is using it."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
 class Video(KeyboardInteraction):
 
-    def __init__(self, name='', *args, **kwargs):
+    def __init__(self, name='', *args, cache_size=0, **kwargs):
         super().__init__(*args, **kwargs)
         self.frame_number = 0
         self.name = name
+        self.frame_cache = FrameCache(cache_size) if cache_size > 0 else None
+        self.playback_clock = None
 
     @classmethod
     def open(cls, path, convert_to_grayscale=True, import_frames=False, *args, **kwargs):
@@ -29,12 +49,16 @@ class Video(KeyboardInteraction):
             else:  # import frames from video
                 video = _VideoArray.from_video(path, **kwargs)
         elif path.suffix == '.avi':
-            try:  # open avi file (xvid or other compression)
-                video = _VideoFile(path, convert_to_grayscale, *args, **kwargs)
-                if video.fourcc == 'H264':
-                    raise ValueError()
-            except ValueError:  # open h264 compressed file
+            # the codec is read from the file header so that no capture object is opened until frames are needed
+            fourcc = read_avi_fourcc(path)
+            if fourcc is None:  # header could not be parsed, ask the decoder instead
+                probe = _VideoFile(path, convert_to_grayscale)
+                fourcc = probe.fourcc
+                probe.release()
+            if fourcc == 'H264':  # open h264 compressed file
                 video = _VideoFileH264(path, convert_to_grayscale, *args, **kwargs)
+            else:  # open avi file (xvid or other compression)
+                video = _VideoFile(path, convert_to_grayscale, *args, **kwargs)
         else:
             raise ValueError(f"{path} is not a valid file type.")
         return video
@@ -54,12 +78,44 @@ class Video(KeyboardInteraction):
     def set_frame(self, f):
         self.frame_number = f
 
+    @profiler('video.grab_frame')
     def grab_frame(self, f):
+        """Returns frame f. If the video was opened with a cache_size, frames are served from an LRU cache of decoded
+        frames (see FrameCache) and only decoded on a cache miss."""
+        if self.frame_cache is not None:
+            frame = self.frame_cache.get(f)
+            if frame is not None:
+                self._cache_hit(f)
+                return frame
+        frame = self._grab_frame(f)
+        if frame is None:
+            return self._frame_error(f)
+        if self.frame_cache is not None:
+            frame = self.frame_cache.put(f, frame)
+        return frame
+
+    def _grab_frame(self, f):
+        """Decodes frame f. Returns None if the frame could not be decoded."""
         self.set_frame(f)
 
+    def _cache_hit(self, f):
+        """Called when grab_frame is served from the cache instead of decoding."""
+        self.frame_number = f
+
+    def _frame_error(self, f):
+        profiler.count('frame_errors')
+        message = f'Frame #{f} does not exist!'
+        warnings.warn(message, category=FrameErrorWarning)
+        return np.zeros(self.shape[::-1], dtype='uint8')
+
+    @profiler('video.advance_frame')
     def advance_frame(self):
         self.frame_number += 1
 
+    def skip_frames(self, n):
+        """Moves forward n frames without returning them."""
+        self.set_frame(self.frame_number + n)
+
     def scroll(self, **kwargs):
         first_frame = kwargs.get('first_frame', 0)
         last_frame = kwargs.get('last_frame', self.frame_count)
@@ -82,149 +138,457 @@ class Video(KeyboardInteraction):
         return self.k
 
     def play(self, **kwargs):
+        """Plays the video in real time. Frames are scheduled with a PlaybackClock, and frames that are already late
+        (because decoding or display_function is slower than the frame rate) are skipped unless drop_frames is False.
+        The clock is kept as playback_clock, which reports the achieved frame rate and the number of dropped frames."""
         first_frame = kwargs.get('first_frame', 0)
         last_frame = kwargs.get('last_frame', self.frame_count)
         name = kwargs.get('name', self.name)
         frame_rate = kwargs.get('frame_rate', self.frame_rate)
-        frame_time = max(1, int(1000. / frame_rate))
+        drop_frames = kwargs.get('drop_frames', True)
         display_function = kwargs.get('display_function', None)
         display_kwargs = kwargs.get('display_kwargs', dict())
+        n_frames = last_frame - first_frame
         cv2.namedWindow(name)
         self.set_frame(first_frame)
-        for f in range(first_frame, last_frame):
+        self.playback_clock = clock = PlaybackClock(frame_rate)
+        i = 0
+        while i < n_frames:
+            late = min(clock.due(), n_frames) - i
+            if drop_frames and (late > 0):  # behind schedule
+                self.skip_frames(late)
+                clock.dropped(late)
+                i += late
+                if i == n_frames:
+                    break
             frame = self.advance_frame()
             if display_function is not None:
                 frame = display_function(frame, **display_kwargs)
             cv2.imshow(name, frame)
-            self.wait(frame_time)
+            clock.shown()
+            i += 1
+            self.wait(clock.wait_time(i))
             if self.valid():
                 break
         cv2.destroyWindow(name)
         return self.k
 
-    def _return_range(self, first, last):
-        self.frame_number = first
-        frames = []
+    def _stack(self, frames, n, out=None):
+        """Writes n frames from an iterable into out. If out is None, it is allocated once the first frame is known."""
+        if (out is not None) and (len(out) != n):
+            raise ValueError(f'Output array has space for {len(out)} frames but {n} frames were requested.')
+        for i, frame in enumerate(frames):
+            if out is None:
+                out = np.empty((n,) + frame.shape, dtype=frame.dtype)
+            out[i] = frame
+        if out is None:
+            out = np.empty((0,) + self.shape[::-1], dtype='uint8')
+        return out
+
+    def _return_range(self, first, last, out=None):
         self.set_frame(first)
-        for f in range(first, last):
-            frame = self.advance_frame()
-            frames.append(frame)
-        return frames
-
-    def _return_frames(self, *args):
-        frames = []
-        for f in args:
-            frame = self.grab_frame(f)
-            frames.append(frame)
-        return frames
-
-    def return_frames(self, *args, as_object=False, **kwargs):
+        return self._stack((self.advance_frame() for f in range(first, last)), last - first, out)
+
+    def _return_frames(self, *args, out=None):
+        return self._stack((self.grab_frame(f) for f in args), len(args), out)
+
+    def return_frames(self, *args, as_object=False, out=None, **kwargs):
+        """Returns frames as an array.
+
+        Parameters
+        ----------
+        args : int
+            No arguments: all frames. One argument: a single frame. Two arguments: the range of frames from first to
+            last. More than two arguments: the given frames.
+        as_object : bool (default = False)
+            Return the frames as a Video object instead of an array.
+        out : np.ndarray (optional)
+            Preallocated array that frames are written into, with shape (n_frames, height, width).
+        """
         if len(args) == 0:
-            frames = self._return_range(0, self.frame_count)
-        elif len(args) == 1:
-            frames = [self.grab_frame(args[0])]
+            frames = self._return_range(0, self.frame_count, out=out)
         elif len(args) == 2:
-            frames = self._return_range(*args)
+            frames = self._return_range(*args, out=out)
         else:
-            frames = self._return_frames(*args)
+            frames = self._return_frames(*args, out=out)
         if as_object:
             return _VideoArray(frames, self.frame_rate, **kwargs)
         else:
-            return np.array(frames)
+            return frames
+
+    def iter_chunks(self, first=0, last=None, chunk_size=1000):
+        """Iterates over a range of frames, chunk_size frames at a time.
+
+        Parameters
+        ----------
+        first, last : int (optional)
+            Range of frames (defaults to the whole video).
+        chunk_size : int (default = 1000)
+            Number of frames in each chunk.
+
+        Yields
+        ------
+        start, stop : int
+            Range of frames in the chunk.
+        frames : np.ndarray
+            Frames of the chunk, shape (stop - start, height, width). The array is reused for the next chunk (or is a
+            view of the video itself), so it must not be modified and must be copied if it is kept.
+        """
+        last = self.frame_count if last is None else last
+        buffer = None
+        for start in range(first, last, chunk_size):
+            stop = min(start + chunk_size, last)
+            frames = self._return_range(start, stop, out=None if buffer is None else buffer[:stop - start])
+            if buffer is None:
+                buffer = frames
+            yield start, stop, frames
+
+    def export(self, path, chunk_size=1000, roi=None, first_frame=0, last_frame=None):
+        """Streams frames into a memory-mapped .npy file, one chunk at a time.
+
+        Parameters
+        ----------
+        path : str or Path
+            Output .npy file.
+        chunk_size : int (default = 1000)
+            Number of frames decoded and written at a time. At most one chunk of frames is held in memory.
+        roi : tuple (optional)
+            Corner points ((x1, y1), (x2, y2)) of a region of interest (inclusive) to crop every frame to.
+        first_frame, last_frame : int (optional)
+            Range of frames to export (defaults to the whole video).
+
+        Returns
+        -------
+        _VideoArray
+            The exported video, memory-mapped from the output file.
+        """
+        path = Path(path).with_suffix('.npy')
+        if last_frame is None:
+            last_frame = self.frame_count
+        n = last_frame - first_frame
+        if n <= 0:
+            raise ValueError(f'No frames between {first_frame} and {last_frame}.')
+        if roi is None:
+            rows, cols = slice(None), slice(None)
+        else:
+            (x1, y1), (x2, y2) = roi
+            xmin, ymin, xmax, ymax = min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2)
+            if (xmin < 0) or (ymin < 0) or (xmax >= self.shape[0]) or (ymax >= self.shape[1]):
+                raise ValueError(f'ROI {roi} is outside the frame (width, height = {self.shape}).')
+            rows, cols = slice(ymin, ymax + 1), slice(xmin, xmax + 1)
+        frames = None
+        for start, stop, chunk in self.iter_chunks(first_frame, last_frame, chunk_size):
+            chunk = chunk[:, rows, cols]
+            if frames is None:  # shape of exported frames is only known once the first chunk has been decoded
+                frames = np.lib.format.open_memmap(path, mode='w+', dtype='uint8', shape=(n,) + chunk.shape[1:])
+            frames[start - first_frame:stop - first_frame] = chunk
+            frames.flush()
+        del frames
+        return _VideoArray.from_numpy(path, mmap=True, frame_rate=self.frame_rate, name=self.name)
 
 
 class _VideoFile(Video):
 
-    def __init__(self, path, convert_to_grayscale=True, *args, **kwargs):
+    n_error_frames = 0  # number of frames at the start of the video that cannot be reached by seeking
+    capture_pool = capture_pool  # limits the number of videos with an open capture object
+    max_decode_forward = 16  # seeking to a keyframe costs about as much as decoding this many frames
+
+    def __init__(self, path, convert_to_grayscale=True, *args, prefetch=0, seek_index=True, decode_threads=1,
+                 **kwargs):
         self.path = Path(path)
-        self.cap = cv2.VideoCapture(str(self.path))
+        self._cap = None
+        self._lock = threading.RLock()
+        self._metadata = None
         self.convert_to_grayscale = convert_to_grayscale
+        self.prefetch = prefetch
+        self._prefetcher = None
+        self.seek_index = seek_index
+        self._keyframe_index = None
+        self._pending_seek = None
+        self.decode_threads = decode_threads
         name = kwargs.get('name', self.path.name)
         super().__init__(name, *args, **kwargs)
 
+    @property
+    def cap(self):
+        """The capture object, which is opened on first use and may be released by the capture pool when idle."""
+        if self._cap is None:
+            self._cap = cv2.VideoCapture(str(self.path))
+            self.capture_pool.opened(self)
+        else:
+            self.capture_pool.touch(self)
+        return self._cap
+
+    def release(self, blocking=True) -> bool:
+        """Closes the capture object. It is reopened (at the same position) the next time a frame is decoded.
+
+        If blocking is False and another thread is using the video, nothing is released and False is returned.
+        """
+        if not self._lock.acquire(blocking=blocking):
+            return False
+        try:
+            if self._cap is None:
+                return True
+            if self._prefetcher is not None:
+                position = self._prefetcher.position
+                self.stop_prefetch()
+            else:
+                position = int(self._cap.get(cv2.CAP_PROP_POS_FRAMES))
+            self._cap.release()
+            self._cap = None
+            if self._pending_seek is None:
+                self._pending_seek = position
+            self.capture_pool.closed(self)
+            return True
+        finally:
+            self._lock.release()
+
+    @property
+    @_locked
+    def metadata(self) -> dict:
+        """Properties of the video, read from the capture object once and then cached."""
+        if self._metadata is None:
+            cap = self.cap
+            fourcc = int(cap.get(cv2.CAP_PROP_FOURCC))
+            self._metadata = dict(frame_count=int(cap.get(cv2.CAP_PROP_FRAME_COUNT)),
+                                  frame_rate=cap.get(cv2.CAP_PROP_FPS),
+                                  shape=(int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                                         int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))),
+                                  fourcc=''.join([chr((fourcc >> i) & 255) for i in range(0, 32, 8)]))
+        return self._metadata
+
     @property
     def frame_count(self) -> int:
-        return int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        return self.metadata['frame_count']
 
     @property
     def frame_rate(self) -> float:
-        return self.cap.get(cv2.CAP_PROP_FPS)
+        return self.metadata['frame_rate']
 
     @property
     def shape(self) -> tuple:
-        return int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        return self.metadata['shape']
 
     @property
     def fourcc(self) -> str:
-        fourcc = int(self.cap.get(cv2.CAP_PROP_FOURCC))
-        return ''.join([chr((fourcc >> i) & 255) for i in range(0, 32, 8)])
+        return self.metadata['fourcc']
 
+    @property
+    def keyframe_index(self):
+        """KeyframeIndex of the video (None if seek indexing is disabled or the file cannot be indexed). The index is
+        built on first access and cached in a sidecar file next to the video."""
+        if self.seek_index and (self._keyframe_index is None):
+            self._keyframe_index = KeyframeIndex.open(self.path, self.frame_count)
+            if self._keyframe_index is None:
+                self.seek_index = False
+        return self._keyframe_index
+
+    @_locked
     def set_frame(self, f):
         super().set_frame(f)
-        self.cap.set(cv2.CAP_PROP_POS_FRAMES, self.frame_number)
+        self._seek(f)
+
+    @profiler('video.seek')
+    def _seek(self, f):
+        """Positions the capture object so that the next read returns frame f."""
+        self._pending_seek = None
+        if self._prefetcher is None:
+            position = int(self.cap.get(cv2.CAP_PROP_POS_FRAMES))
+        else:  # position of the capture is unknown while prefetching
+            self.stop_prefetch()
+            position = -1
+        index = self.keyframe_index
+        cap = self.cap
+        if index is None:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, f)
+            return
+        # Decode forward from the current position (if it is known) unless seeking to the nearest keyframe skips more
+        # than max_decode_forward frames
+        keyframe = index.keyframe(f)
+        if not ((0 <= position <= f) and (keyframe - position <= self.max_decode_forward)):
+            cap.set(cv2.CAP_PROP_POS_FRAMES, keyframe)
+            position = keyframe
+        for i in range(position, f):
+            cap.grab()
 
-    def cvt_frame(self, frame):
+    def play(self, **kwargs):
+        """Plays the video in real time (see Video.play), decoding ahead on a background thread. The number of frames
+        decoded ahead can be set with the prefetch keyword (default = 8, or the prefetch of the video if larger)."""
+        prefetch = self.prefetch
+        self.prefetch = kwargs.pop('prefetch', max(prefetch, 8))
+        try:
+            return super().play(**kwargs)
+        finally:
+            self.prefetch = prefetch
+            if (prefetch == 0) and (self._prefetcher is not None):
+                self.stop_prefetch()
+                self._pending_seek = self.frame_number
+
+    @_locked
+    def skip_frames(self, n):
+        """Moves forward n frames. Frames that have already been prefetched are discarded rather than seeking."""
+        if (self._prefetcher is not None) and (self._pending_seek is None):
+            for i in range(n):
+                self.read()
+            self.frame_number += n
+        else:
+            super().skip_frames(n)
+
+    def stop_prefetch(self):
+        """Stops background decoding (if running). Prefetching restarts on the next call to advance_frame."""
+        if self._prefetcher is not None:
+            self._prefetcher.stop()
+            self._prefetcher = None
+
+    @_locked
+    def read(self):
+        """Reads the next frame from the capture object, from the prefetch queue if prefetching is enabled."""
+        if self.prefetch > 0:
+            if self._prefetcher is None:
+                self._prefetcher = FramePrefetcher(self.cap, self.prefetch)
+            return self._prefetcher.read()
+        return self.cap.read()
+
+    def cvt_frame(self, frame, out=None):
+        """Converts a decoded frame to grayscale (if convert_to_grayscale is True), returning a contiguous array so that
+        it can be displayed or processed without another copy. If out is given, the frame is written into it."""
         if self.convert_to_grayscale and (frame.ndim == 3):
-            return frame[..., 0]
+            return cv2.extractChannel(frame, 0, dst=out)
+        elif out is not None:
+            np.copyto(out, frame)
+            return out
         else:
             return frame
 
-    def grab_frame(self, f):
+    @_locked
+    def _grab_frame(self, f):
         self.set_frame(f)
         ret, frame = self.cap.read()
         if ret:
             return self.cvt_frame(frame)
-        else:
-            message = f'Frame #{f} does not exist!'
-            warnings.warn(message, category=FrameErrorWarning)
-            return np.zeros(self.shape[::-1], dtype='uint8')
 
+    def _cache_hit(self, f):
+        super()._cache_hit(f)
+        self._pending_seek = f + 1  # where a decoded grab_frame would have left the capture
+
+    def _segments(self, first, last):
+        """Splits a range of frames at keyframes into (up to) decode_threads segments that can be decoded
+        independently. Returns an empty list if the video has no keyframe index."""
+        index = self.keyframe_index
+        if index is None:
+            return []
+        keyframes = index.keyframes
+        keyframes = keyframes[(keyframes > max(first, self.n_error_frames - 1)) & (keyframes < last)]
+        if len(keyframes):
+            targets = first + (last - first) * np.arange(1, self.decode_threads) / self.decode_threads
+            keyframes = np.unique(keyframes[np.clip(np.searchsorted(keyframes, targets), 0, len(keyframes) - 1)])
+        edges = [first] + [int(k) for k in keyframes] + [last]
+        return list(zip(edges[:-1], edges[1:]))
+
+    def _decode_segment(self, start, stop, out):
+        """Decodes frames from start to stop into out using a separate capture object."""
+        cap = cv2.VideoCapture(str(self.path))
+        try:
+            if start < self.n_error_frames:  # decode from the start of the file instead of seeking
+                for i in range(start):
+                    cap.grab()
+            elif start > 0:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+            for i, f in enumerate(range(start, stop)):
+                ret, frame = cap.read()
+                if ret:
+                    self.cvt_frame(frame, out[i])
+                else:
+                    profiler.count('frame_errors')
+                    warnings.warn(f'Frame #{f} does not exist!', category=FrameErrorWarning)
+                    out[i] = 0
+        finally:
+            cap.release()
+
+    @profiler('video.return_range')
+    def _return_range(self, first, last, out=None):
+        """Decodes a range of frames. If decode_threads > 1, segments of the range that start at keyframes are decoded
+        in parallel, each by its own thread and capture object."""
+        segments = self._segments(first, last) if self.decode_threads > 1 else []
+        if len(segments) < 2:
+            return super()._return_range(first, last, out)
+        if out is None:
+            shape = self.shape[::-1] if self.convert_to_grayscale else self.shape[::-1] + (3,)
+            out = np.empty((last - first,) + shape, dtype='uint8')
+        elif len(out) != last - first:
+            raise ValueError(f'Output array has space for {len(out)} frames but {last - first} frames were requested.')
+        with ThreadPoolExecutor(max_workers=self.decode_threads) as pool:
+            futures = [pool.submit(self._decode_segment, start, stop, out[start - first:stop - first])
+                       for start, stop in segments]
+            for future in futures:
+                future.result()
+        self.frame_number = last
+        self._pending_seek = last
+        return out
+
+    @profiler('video.advance_frame')
+    @_locked
     def advance_frame(self):
-        ret, frame = self.cap.read()
+        if self._pending_seek is not None:
+            self._seek(self._pending_seek)
+        ret, frame = self.read()
         super().advance_frame()
         if ret:
             return self.cvt_frame(frame)
         else:
+            profiler.count('frame_errors')
             message = f'Frame #{self.frame_number - 1} does not exist!'
-            warnings.warn(message)
-            return np.zeros(self.shape, dtype='uint8')
+            warnings.warn(message, category=FrameErrorWarning)
+            return np.zeros(self.shape[::-1], dtype='uint8')
 
 
 class _VideoFileH264(_VideoFile):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        assert self.fourcc == 'H264'
         self.n_error_frames = 19
-        if self.convert_to_grayscale:
-            self.error_frames = np.zeros((self.n_error_frames, self.shape[1], self.shape[0]), dtype='uint8')
-        else:
-            self.error_frames = np.zeros((self.n_error_frames, self.shape[1], self.shape[0], 3), dtype='uint8')
-        while self.frame_number < self.n_error_frames:
-            ret, frame = self.cap.read()
-            self.error_frames[self.frame_number] = self.cvt_frame(frame)
-            self.frame_number += 1
+        self._error_frames = None
         self.set_frame(0)
 
+    @property
+    def error_frames(self):
+        """The first n_error_frames frames, which are decoded (with a separate capture object) on first access."""
+        if self._error_frames is None:
+            if self.convert_to_grayscale:
+                shape = (self.n_error_frames, self.shape[1], self.shape[0])
+            else:
+                shape = (self.n_error_frames, self.shape[1], self.shape[0], 3)
+            self._error_frames = np.zeros(shape, dtype='uint8')
+            self._decode_segment(0, self.n_error_frames, self._error_frames)
+        return self._error_frames
+
     def set_frame(self, f):
         if f >= self.n_error_frames:
             super().set_frame(f)
         else:
             self.frame_number = f
+            self._pending_seek = self.n_error_frames  # the capture is only read once the error frames are exhausted
 
-    def grab_frame(self, f):
+    def _grab_frame(self, f):
         if f >= self.n_error_frames:
-            return super().grab_frame(f)
+            return super()._grab_frame(f)
         else:
             self.set_frame(f)
             frame = self.error_frames[f]
             return frame
 
+    def _cache_hit(self, f):
+        if f >= self.n_error_frames:
+            super()._cache_hit(f)
+        else:
+            self.set_frame(f)
+
+    @profiler('video.advance_frame')
     def advance_frame(self):
         if self.frame_number >= self.n_error_frames:
             return super().advance_frame()
         else:
-            frame = self.grab_frame(self.frame_number)
+            frame = self.error_frames[self.frame_number]
             self.frame_number += 1
             return frame
 
@@ -252,8 +616,12 @@ class _VideoArray(Video):
         return cls(frames, fps, **kwargs)
 
     @classmethod
-    def from_numpy(cls, path, **kwargs):
-        frames = np.load(path).astype('uint8')
+    def from_numpy(cls, path, mmap=False, **kwargs):
+        """Opens frames stored in a .npy file. If mmap is True, the file is memory-mapped (read-only) so that frames
+        are only read from disk when they are accessed."""
+        frames = np.load(path, mmap_mode='r' if mmap else None)
+        if frames.dtype != np.uint8:
+            frames = frames.astype('uint8')
         return cls(frames, **kwargs)
 
     @property
@@ -268,7 +636,7 @@ class _VideoArray(Video):
     def shape(self):
         return self.frames.shape[2], self.frames.shape[1]
 
-    def grab_frame(self, f):
+    def _grab_frame(self, f):
         self.set_frame(f)
         try:
             frame = self.frames[self.frame_number]
@@ -276,6 +644,28 @@ class _VideoArray(Video):
         except IndexError:
             raise ValueError('Frame #{} does not exist!'.format(self.frame_number))
 
+    def _return_range(self, first, last, out=None):
+        self.set_frame(last)
+        frames = self.frames[first:last]
+        if out is None:  # return a view
+            return frames
+        np.copyto(out, frames)
+        return out
+
+    def iter_chunks(self, first=0, last=None, chunk_size=1000):
+        # frames are already in memory (or memory-mapped), so chunks are views rather than copies
+        last = self.frame_count if last is None else last
+        for start in range(first, last, chunk_size):
+            stop = min(start + chunk_size, last)
+            yield start, stop, self._return_range(start, stop)
+
+    def _return_frames(self, *args, out=None):
+        if (len(args) > 0) and np.all(np.diff(args) == 1):  # contiguous range
+            return self._return_range(args[0], args[-1] + 1, out=out)
+        self.set_frame(args[-1])
+        return np.take(self.frames, args, axis=0, out=out)
+
+    @profiler('video.advance_frame')
     def advance_frame(self):
         try:
             frame = self.frames[self.frame_number]
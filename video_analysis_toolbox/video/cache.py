@@ -0,0 +1,81 @@
+from collections import OrderedDict
+import numpy as np
+import threading
+
+
+class FrameCache:
+    """Least-recently-used cache of decoded frames, bounded by the total number of bytes stored.
+
+    The cache keeps its own read-only copy of every frame and returns writable copies, so frames can be drawn on in
+    place without changing the cached data.
+
+    Parameters
+    ----------
+    max_bytes : int
+        Maximum number of bytes of frame data held in the cache.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = int(max_bytes)
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._frames = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._frames)
+
+    def __contains__(self, f):
+        return f in self._frames
+
+    def get(self, f):
+        """Returns a copy of a frame from the cache (None if the frame is not cached)."""
+        with self._lock:
+            try:
+                frame = self._frames[f]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._frames.move_to_end(f)
+            self.hits += 1
+        return frame.copy()
+
+    def put(self, f, frame):
+        """Adds a copy of a frame to the cache, evicting the least recently used frames to stay within max_bytes.
+
+        Returns
+        -------
+        frame : np.ndarray
+            The frame that was passed in (the caller keeps ownership of it).
+        """
+        if frame.nbytes > self.max_bytes:
+            return frame
+        stored = np.array(frame, order='C')
+        stored.setflags(write=False)
+        with self._lock:
+            if f in self._frames:
+                self.nbytes -= self._frames.pop(f).nbytes
+            while self._frames and (self.nbytes + stored.nbytes > self.max_bytes):
+                self.nbytes -= self._frames.popitem(last=False)[1].nbytes
+            self._frames[f] = stored
+            self.nbytes += stored.nbytes
+        return frame
+
+    def clear(self):
+        """Removes all frames from the cache and resets the statistics."""
+        with self._lock:
+            self._frames.clear()
+            self.nbytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    @property
+    def stats(self) -> dict:
+        """Cache statistics: hits, misses, hit_rate, frames and nbytes."""
+        requests = self.hits + self.misses
+        return dict(hits=self.hits,
+                    misses=self.misses,
+                    hit_rate=(self.hits / requests) if requests else 0.0,
+                    frames=len(self._frames),
+                    nbytes=self.nbytes)
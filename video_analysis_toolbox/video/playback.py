@@ -0,0 +1,63 @@
+import time
+
+
+class PlaybackClock:
+    """Schedules frames against a monotonic clock so that playback runs in real time.
+
+    Frame i of a playback is due frame_interval * i seconds after the clock was started. Time spent decoding and
+    displaying frames is absorbed by waiting only for the remainder of each interval, and frames that are already late
+    can be dropped to catch up.
+
+    Parameters
+    ----------
+    frame_rate : float
+        Frame rate of the video (frames per second).
+    speed : float (default = 1.0)
+        Playback speed relative to real time.
+
+    Attributes
+    ----------
+    n_shown : int
+        Number of frames shown since the clock was started.
+    n_dropped : int
+        Number of frames dropped since the clock was started.
+    """
+
+    def __init__(self, frame_rate, speed=1.0):
+        self.frame_interval = 1. / (frame_rate * speed)
+        self.start()
+
+    def start(self):
+        """(Re)starts the clock and resets the frame counters."""
+        self.t0 = time.monotonic()
+        self.n_shown = 0
+        self.n_dropped = 0
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the clock was started."""
+        return time.monotonic() - self.t0
+
+    def due(self) -> int:
+        """Index of the frame that should be on screen now."""
+        return int(self.elapsed / self.frame_interval)
+
+    def wait_time(self, i) -> int:
+        """Milliseconds until frame i is due (at least 1, so that it can be passed to cv2.waitKey)."""
+        return max(1, int(round(1000 * (i * self.frame_interval - self.elapsed))))
+
+    def shown(self, n=1):
+        self.n_shown += n
+
+    def dropped(self, n=1):
+        self.n_dropped += n
+
+    @property
+    def achieved_fps(self) -> float:
+        """Number of frames shown per second since the clock was started."""
+        elapsed = self.elapsed
+        return self.n_shown / elapsed if elapsed > 0 else 0.
+
+    def summary(self) -> dict:
+        return dict(target_fps=1. / self.frame_interval, achieved_fps=self.achieved_fps, n_shown=self.n_shown,
+                    n_dropped=self.n_dropped)
@@ -1,19 +1,46 @@
 from ..utilities.keyboard_interaction import KeyboardInteraction
+from .playback import PlaybackClock
 import cv2
 
 
 class VideoPlayer(KeyboardInteraction):
+    """Shows frames in a window as they are passed in.
 
-    def __init__(self, name, frame_time=1):
+    Parameters
+    ----------
+    name : str
+        Name of the window.
+    frame_time : int (default = 1)
+        Milliseconds to wait after each frame (ignored if frame_rate is given).
+    frame_rate : float (optional)
+        If given, frames are shown in real time at this rate using a PlaybackClock. Frames that arrive after the next
+        frame is due are dropped (not shown) unless drop_frames is False.
+    drop_frames : bool (default = True)
+        Whether late frames are dropped when playing at a frame_rate.
+    """
+
+    def __init__(self, name, frame_time=1, frame_rate=None, drop_frames=True):
         super().__init__()
         self.name = name
         self.frame_time = frame_time
+        self.drop_frames = drop_frames
+        self.clock = PlaybackClock(frame_rate) if frame_rate else None
+        self.i = 0
         cv2.namedWindow(self.name)
 
     def __call__(self, *args, **kwargs):
         for arg in args:
-            cv2.imshow(self.name, arg)
-            self.wait(self.frame_time)
+            if self.clock is None:
+                cv2.imshow(self.name, arg)
+                self.wait(self.frame_time)
+            else:
+                self.i += 1
+                if self.drop_frames and (self.clock.due() > self.i):  # already late for the next frame
+                    self.clock.dropped()
+                    continue
+                cv2.imshow(self.name, arg)
+                self.clock.shown()
+                self.wait(self.clock.wait_time(self.i))
             if self.valid():
                 self.close()
                 return False
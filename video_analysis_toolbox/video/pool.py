@@ -0,0 +1,82 @@
+from collections import OrderedDict
+import threading
+import time
+import weakref
+
+
+class CapturePool:
+    """Keeps track of the videos that have an open capture object and limits how many are open at once.
+
+    When a video opens its capture and the pool is full, the capture of the least recently used video is released (it
+    is reopened automatically the next time that video needs to decode a frame). If idle_timeout is set, captures that
+    have not been used for that long are also released whenever any video in the pool is used (at most once every
+    idle_timeout / 4 seconds). release_idle can also be called directly, e.g. from a timer.
+
+    Captures are released with video.release(blocking=False), so a video that another thread is using at that moment
+    keeps its capture (and stays in the pool) instead of being closed in the middle of a read.
+
+    Parameters
+    ----------
+    max_open : int (default = 32)
+        Maximum number of capture objects that are open at the same time.
+    idle_timeout : float (optional)
+        Number of seconds after which an unused capture is released (None to keep captures open until evicted).
+    """
+
+    def __init__(self, max_open=32, idle_timeout=None):
+        self.max_open = max_open
+        self.idle_timeout = idle_timeout
+        self._videos = OrderedDict()  # id(video) -> (weakref to video, time of last use)
+        self._lock = threading.RLock()
+        self._last_check = time.monotonic()
+
+    def __len__(self):
+        return len(self._videos)
+
+    def opened(self, video):
+        """Registers a video that has just opened its capture, releasing other captures if the pool is full."""
+        with self._lock:
+            self._videos[id(video)] = (weakref.ref(video), time.monotonic())
+            self._videos.move_to_end(id(video))
+            excess = len(self._videos) - max(self.max_open, 1)
+            for key in list(self._videos)[:max(excess, 0)]:  # least recently used first
+                other = self._videos[key][0]()
+                if other is None:
+                    del self._videos[key]
+                elif other.release(blocking=False):  # removes itself from the pool
+                    self._videos.pop(key, None)
+        self._check_idle()
+
+    def touch(self, video):
+        """Marks a video as recently used."""
+        with self._lock:
+            if id(video) in self._videos:
+                self._videos[id(video)] = (self._videos[id(video)][0], time.monotonic())
+                self._videos.move_to_end(id(video))
+        self._check_idle()
+
+    def _check_idle(self):
+        """Releases idle captures if idle_timeout is set and they have not been checked recently."""
+        if self.idle_timeout is None:
+            return
+        now = time.monotonic()
+        if now - self._last_check >= self.idle_timeout / 4.:
+            self._last_check = now
+            self.release_idle(self.idle_timeout)
+
+    def closed(self, video):
+        """Removes a video whose capture has been released."""
+        with self._lock:
+            self._videos.pop(id(video), None)
+
+    def release_idle(self, timeout):
+        """Releases the capture of every video that has not been used in the last timeout seconds."""
+        now = time.monotonic()
+        with self._lock:
+            idle = [ref() for ref, last_used in self._videos.values() if now - last_used > timeout]
+        for video in idle:
+            if video is not None:
+                video.release(blocking=False)
+
+
+capture_pool = CapturePool(idle_timeout=300)
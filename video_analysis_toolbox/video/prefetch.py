@@ -0,0 +1,94 @@
+import atexit
+import cv2
+import queue
+import threading
+import weakref
+
+
+_running = weakref.WeakSet()
+
+
+@atexit.register
+def _stop_all():
+    """Stops decoding threads before the interpreter shuts down (daemon threads must not be killed inside OpenCV)."""
+    for prefetcher in list(_running):
+        prefetcher.stop()
+
+
+class FramePrefetcher:
+    """Decodes frames from a capture object on a background thread.
+
+    Frames are read ahead of the consumer into a bounded queue, so that decoding overlaps with whatever processing
+    happens between calls to read.
+
+    Parameters
+    ----------
+    cap : cv2.VideoCapture
+        An open capture object. The prefetcher has exclusive use of the capture until it is stopped.
+    n : int
+        Maximum number of frames that are decoded ahead of the consumer.
+
+    Attributes
+    ----------
+    position : int
+        Frame number of the next frame returned by read.
+    """
+
+    def __init__(self, cap, n):
+        self.cap = cap
+        self.position = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+        self.queue = queue.Queue(maxsize=max(1, n))
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        _running.add(self)
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            ret, frame = self.cap.read()
+            while not self._stop_event.is_set():
+                try:
+                    self.queue.put((ret, frame), timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+            if not ret:
+                break
+
+    @property
+    def running(self) -> bool:
+        return self._thread.is_alive()
+
+    def read(self):
+        """Returns the next decoded frame.
+
+        Returns
+        -------
+        ret, frame
+            Same as cv2.VideoCapture.read.
+        """
+        while True:
+            try:
+                ret, frame = self.queue.get(timeout=0.1)
+                break
+            except queue.Empty:
+                if not self.running:
+                    try:
+                        ret, frame = self.queue.get_nowait()
+                        break
+                    except queue.Empty:
+                        return False, None
+        if ret:
+            self.position += 1
+        return ret, frame
+
+    def stop(self):
+        """Stops the decoding thread and discards any frames that have not been read. The position of the capture
+        object is undefined afterwards and should be set explicitly."""
+        self._stop_event.set()
+        while self.running:
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                pass
+            self._thread.join(timeout=0.01)
@@ -0,0 +1,188 @@
+from ..utilities.sidecar import sidecar_path, load_sidecar, save_sidecar
+from pathlib import Path
+import numpy as np
+import struct
+
+
+AVIIF_KEYFRAME = 0x10
+
+
+def _read_avi_index(path):
+    """Reads the legacy idx1 index of an AVI file.
+
+    Parameters
+    ----------
+    path : Path
+        Path to an .avi file.
+
+    Returns
+    -------
+    keyframes : np.ndarray or None
+        Frame numbers of all keyframes in the first video stream (None if the file does not contain an idx1 chunk).
+    frame_count : int
+        Number of frames of the first video stream listed in the index.
+    """
+    with open(path, 'rb') as f:
+        riff, size, form = struct.unpack('<4sI4s', f.read(12))
+        if (riff != b'RIFF') or (form != b'AVI '):
+            return None, 0
+        end = 8 + size
+        position = 12
+        while position + 8 <= end:
+            f.seek(position)
+            header = f.read(8)
+            if len(header) < 8:
+                break
+            ckid, cksize = struct.unpack('<4sI', header)
+            if ckid == b'idx1':
+                entries = np.frombuffer(f.read(cksize - (cksize % 16)), dtype=[('ckid', 'S4'),
+                                                                               ('flags', '<u4'),
+                                                                               ('offset', '<u4'),
+                                                                               ('size', '<u4')])
+                return _video_keyframes(entries)
+            position += 8 + cksize + (cksize % 2)
+    return None, 0
+
+
+def _iter_chunks(f, start, end):
+    """Yields (chunk id, size, position of the data, list type) of the RIFF chunks between two positions in a file
+    (list type is None for chunks that are not lists)."""
+    position = start
+    while position + 8 <= end:
+        f.seek(position)
+        header = f.read(8)
+        if len(header) < 8:
+            return
+        ckid, cksize = struct.unpack('<4sI', header)
+        list_type = f.read(4) if ckid in (b'LIST', b'RIFF') else None
+        yield ckid, cksize, position + 8, list_type
+        position += 8 + cksize + (cksize % 2)
+
+
+def read_avi_fourcc(path):
+    """Reads the compression fourcc (biCompression) of the first video stream from the header of an AVI file, without
+    opening a decoder. This is the tag written by the encoder, which can differ from cv2.CAP_PROP_FOURCC for codecs
+    that FFmpeg reports under a generic tag (e.g. XVID is reported as FMP4).
+
+    Returns
+    -------
+    fourcc : str or None
+        None if the header cannot be parsed.
+    """
+    try:
+        with open(path, 'rb') as f:
+            riff, size, form = struct.unpack('<4sI4s', f.read(12))
+            if (riff != b'RIFF') or (form != b'AVI '):
+                return None
+            for ckid, cksize, data, list_type in _iter_chunks(f, 12, 8 + size):
+                if list_type != b'hdrl':
+                    continue
+                for ckid, cksize, data, list_type in _iter_chunks(f, data + 4, data + cksize):
+                    if list_type != b'strl':
+                        continue
+                    stream_type = None
+                    for ckid, cksize, data, list_type in _iter_chunks(f, data + 4, data + cksize):
+                        f.seek(data)
+                        if ckid == b'strh':
+                            stream_type = f.read(4)
+                        elif (ckid == b'strf') and (stream_type == b'vids') and (cksize >= 20):
+                            f.seek(data + 16)
+                            return f.read(4).decode('latin-1')
+                return None
+    except (OSError, struct.error):
+        return None
+    return None
+
+
+def _video_keyframes(entries):
+    """Extracts keyframes of the first video stream from idx1 entries."""
+    streams = np.array([ckid[:2] if ckid[2:] in (b'dc', b'db') else b'' for ckid in entries['ckid']])
+    video_streams = streams[streams != b'']
+    if len(video_streams) == 0:
+        return None, 0
+    video = entries[streams == video_streams[0]]
+    keyframes = np.flatnonzero(video['flags'] & AVIIF_KEYFRAME)
+    return keyframes, len(video)
+
+
+class KeyframeIndex:
+    """Index of the keyframes in a compressed video, used to seek to a frame without decoding from the start of the
+    file.
+
+    Parameters
+    ----------
+    keyframes : array like
+        Sorted frame numbers of every keyframe in the video.
+    frame_count : int
+        Total number of frames in the video.
+    """
+
+    suffix = '.keyframes.npz'
+
+    def __init__(self, keyframes, frame_count):
+        self.keyframes = np.asarray(keyframes, dtype='int64')
+        self.frame_count = int(frame_count)
+
+    def __len__(self):
+        return len(self.keyframes)
+
+    @staticmethod
+    def sidecar(path) -> Path:
+        """Returns the path of the sidecar file that stores the index for a video."""
+        return sidecar_path(path, KeyframeIndex.suffix)
+
+    @classmethod
+    def from_avi(cls, path):
+        """Builds the index from the idx1 chunk of an AVI file. Returns None if the file has no usable index."""
+        keyframes, frame_count = _read_avi_index(path)
+        if (keyframes is None) or (len(keyframes) == 0) or (keyframes[0] != 0):
+            return None
+        return cls(keyframes, frame_count)
+
+    @classmethod
+    def load(cls, path):
+        """Loads the index of a video from its sidecar file. Returns None if the sidecar does not exist or is out of
+        date."""
+        data = load_sidecar(path, cls.suffix, 'keyframes', 'frame_count')
+        return None if data is None else cls(*data)
+
+    def save(self, path):
+        """Saves the index to the sidecar file of a video."""
+        save_sidecar(path, self.suffix, keyframes=self.keyframes, frame_count=self.frame_count)
+
+    @classmethod
+    def open(cls, path, frame_count=None):
+        """Loads the index of a video from its sidecar file, building and saving it first if necessary.
+
+        Parameters
+        ----------
+        path : str or Path
+            Path to a video file.
+        frame_count : int (optional)
+            Number of frames reported by the decoder. The index is discarded if it does not match.
+
+        Returns
+        -------
+        KeyframeIndex or None
+            None if no index could be built for the video.
+        """
+        path = Path(path)
+        index = cls.load(path)
+        if index is None:
+            if path.suffix != '.avi':
+                return None
+            index = cls.from_avi(path)
+            if index is None:
+                return None
+            try:
+                index.save(path)
+            except OSError:  # read-only location, use the index without caching it
+                pass
+        if (frame_count is not None) and (index.frame_count != frame_count):
+            return None
+        return index
+
+    def keyframe(self, f) -> int:
+        """Returns the nearest keyframe at or before frame f."""
+        i = np.searchsorted(self.keyframes, f, side='right') - 1
+        return int(self.keyframes[max(i, 0)])